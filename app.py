@@ -1,38 +1,12 @@
 from flask import Flask
 import os
 from dotenv import load_dotenv
-from extensions import db, login_manager
+from extensions import db, login_manager, optimization_jobs, optimizer_pool, routine_cache, batch_optimizer, server_session, pdf_renderer, pdf_cache, schedule_config, reminder_scheduler
 from flask_migrate import Migrate
-import threading
-import time
-from datetime import datetime
 
 # Load environment variables
 load_dotenv()
 
-def check_events_worker(app):
-    """Background worker to check for events needing notification"""
-    with app.app_context():
-        from models import Event
-        
-        while True:
-            try:
-                # Mark expired events
-                expired_count = Event.mark_expired_events()
-                if expired_count > 0:
-                    print(f"{datetime.utcnow()}: Marked {expired_count} events as expired")
-                
-                # Send notifications for upcoming events
-                notification_count = Event.check_notifications_to_send()
-                if notification_count > 0:
-                    print(f"{datetime.utcnow()}: Sent {notification_count} event notifications")
-                
-            except Exception as e:
-                print(f"Error in background worker: {str(e)}")
-            
-            # Check every 30 minutes
-            time.sleep(1800)
-
 def create_app():
     app = Flask(__name__)
     
@@ -41,19 +15,56 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///site.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # Session storage configuration
+    app.config['SESSION_BACKEND'] = os.getenv('SESSION_BACKEND', 'filesystem')
+    app.config['SESSION_REDIS_URL'] = os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+    
+    # Class schedule configuration ('HH:MM-HH:MM' slots and day names, comma-separated)
+    app.config['SCHEDULE_TIME_SLOTS'] = os.environ['SCHEDULE_TIME_SLOTS'].split(',') if os.getenv('SCHEDULE_TIME_SLOTS') else None
+    app.config['SCHEDULE_DAYS'] = os.environ['SCHEDULE_DAYS'].split(',') if os.getenv('SCHEDULE_DAYS') else None
+    
+    # PDF rendering configuration
+    app.config['PDF_RENDER_CONCURRENCY'] = int(os.getenv('PDF_RENDER_CONCURRENCY', 2))
+    app.config['PDF_CACHE_MAX_BYTES'] = int(os.getenv('PDF_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+    
     # Email configuration
     app.config['SENDGRID_API_KEY'] = os.getenv('SENDGRID_API_KEY')
     app.config['SENDGRID_FROM_EMAIL'] = os.getenv('SENDGRID_FROM_EMAIL')
     
+    # Routine optimizer configuration
+    app.config['MAX_OPTIMIZATION_JOBS'] = int(os.getenv('MAX_OPTIMIZATION_JOBS', 4))
+    app.config['MAX_QUEUED_OPTIMIZATION_JOBS'] = int(os.getenv('MAX_QUEUED_OPTIMIZATION_JOBS', 100))
+    app.config['OPTIMIZER_PROCESSES'] = int(os.getenv('OPTIMIZER_PROCESSES', 0))
+    app.config['GA_POPULATION_SIZE'] = int(os.getenv('GA_POPULATION_SIZE', 50))
+    app.config['GA_GENERATIONS'] = int(os.getenv('GA_GENERATIONS', 40))
+    app.config['GA_ISLANDS'] = int(os.getenv('GA_ISLANDS', 1))
+    app.config['GA_MIGRATION_INTERVAL'] = int(os.getenv('GA_MIGRATION_INTERVAL', 5))
+    app.config['ACO_ITERATIONS'] = int(os.getenv('ACO_ITERATIONS', 30))
+    app.config['ACO_DEPOSIT_STRATEGY'] = os.getenv('ACO_DEPOSIT_STRATEGY', 'proportional')
+    app.config['OPTIMIZER_TIME_BUDGET_MS'] = int(os.getenv('OPTIMIZER_TIME_BUDGET_MS', 5000))
+    app.config['OPTIMIZER_PATIENCE'] = int(os.getenv('OPTIMIZER_PATIENCE', 10))
+    app.config['OPTIMIZER_SEED'] = int(os.environ['OPTIMIZER_SEED']) if os.getenv('OPTIMIZER_SEED') else None
+    app.config['ROUTINE_CACHE_SIZE'] = int(os.getenv('ROUTINE_CACHE_SIZE', 1024))
+    app.config['ROUTINE_CACHE_TTL'] = int(os.getenv('ROUTINE_CACHE_TTL', 3600))
+    
     # Initialize extensions with app
     db.init_app(app)
     login_manager.init_app(app)
+    optimization_jobs.init_app(app)
+    optimizer_pool.init_app(app)
+    routine_cache.init_app(app)
+    batch_optimizer.init_app(app, pool=optimizer_pool)
+    server_session.init_app(app)
+    pdf_renderer.init_app(app)
+    pdf_cache.init_app(app)
+    schedule_config.init_app(app)
+    reminder_scheduler.init_app(app)
     
     # Initialize Flask-Migrate
     migrate = Migrate(app, db)
     
     # Import all models to ensure they're tracked by Flask-Migrate
-    from models import User, CourseWeight, CourseDirectory, Notification, Message, Event
+    from models import User, CourseWeight, CourseDirectory, Notification, Message, Event, OptimizedRoutine
     
     # Import and register blueprints
     from controllers.auth_controller import auth_bp
@@ -71,9 +82,10 @@ if __name__ == '__main__':
         db.create_all()
         print("Database tables created successfully")
     
-    # Start background worker for event notifications
-    worker_thread = threading.Thread(target=check_events_worker, args=(app,), daemon=True)
-    worker_thread.start()
-    print("Background worker started")
+    # Start sending event reminders as they fall due, only in the process
+    # that serves requests (the debug reloader's parent just watches files)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        reminder_scheduler.start()
+        print("Reminder scheduler started")
     
     app.run(debug=True) 
\ No newline at end of file
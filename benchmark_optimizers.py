@@ -0,0 +1,245 @@
+"""
+Benchmark the routine optimizers on synthetic course sets.
+
+Every algorithm runs on the same problems with fixed seeds and a range of
+budgets, so the report shows how each one trades wall time for fitness.
+The exact solver provides the optimal fitness each result is compared to.
+Each run is warmed up once and then timed several times; throughput is
+taken from the fastest repeat so scheduler noise does not read as a
+regression.
+
+Usage:
+    python benchmark_optimizers.py --output bench.json --csv bench.csv
+    python benchmark_optimizers.py --baseline bench.json --threshold 10 --repeats 7
+"""
+import argparse
+import csv
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from utils.routine_problem import RoutineProblem
+from utils.exact_optimizer import ExactOptimizer
+from utils.optimizers import create_optimizer
+
+# Course counts and dinner hours of the synthetic problems
+COURSE_COUNTS = (1, 2, 3, 5, 8, 10, 15)
+DINNER_HOURS = (6, 8, 11)
+
+# Budgets swept per algorithm, as keyword arguments of optimize()
+BUDGETS = {
+    'genetic': [{'population_size': 50, 'generations': generations} for generations in (10, 20, 40, 80)],
+    'ant_colony': [{'iterations': iterations} for iterations in (10, 20, 30, 60)],
+    'exact': [{}]
+}
+
+# Algorithms whose evaluations/sec is compared against a baseline; the
+# exact solver scores a single routine, so its rate says nothing
+THROUGHPUT_ALGORITHMS = ('genetic', 'ant_colony')
+
+CSV_FIELDS = ('algorithm', 'budget', 'courses', 'dinner_hour', 'seed', 'wall_ms', 'best_wall_ms',
+              'evaluations', 'evals_per_sec', 'best_fitness', 'optimal_fitness', 'gap', 'peak_kb')
+
+
+def make_problem(num_courses, dinner_hour, seed):
+    """
+    Build a synthetic problem with varied course weights.
+
+    Args:
+        num_courses: Number of courses
+        dinner_hour: Hour reserved for dinner
+        seed: Seed of the weight generator
+
+    Returns:
+        RoutineProblem instance
+    """
+    rng = random.Random(seed)
+    # Mostly light courses with a few heavy ones, like weights after exam events
+    weights = [round(rng.lognormvariate(1.0, 0.6), 2) for _ in range(num_courses)]
+    codes = [f"BM{idx + 101}" for idx in range(num_courses)]
+    return RoutineProblem(codes, weights, dinner_hour=dinner_hour)
+
+
+def scored_routines(metadata):
+    """
+    Count the routines an optimizer scored, fitness cache hits included.
+
+    The cache turns repeated routines into lookups, so its misses alone
+    would make a run that finds fewer duplicates look faster.
+    """
+    if 'cache_misses' in metadata:
+        return metadata['cache_hits'] + metadata['cache_misses']
+    return metadata.get('evaluations', 0)
+
+
+def run_once(algorithm, problem, budget, seed, repeats):
+    """
+    Run one optimization and measure it.
+
+    One untimed warm-up run is followed by ``repeats`` timed runs; the
+    median and the fastest wall time are reported and the throughput is
+    taken from the fastest. The run is repeated once more with tracemalloc
+    enabled to measure the peak memory, so the tracing overhead does not
+    distort the timing.
+
+    Returns:
+        Dictionary with the wall times, evaluations, fitness and peak memory
+    """
+    create_optimizer(algorithm, problem, seed=seed).optimize(**budget)
+
+    walls = []
+    for _ in range(repeats):
+        optimizer = create_optimizer(algorithm, problem, seed=seed)
+        start = time.perf_counter()
+        _, fitness = optimizer.optimize(**budget)
+        walls.append(time.perf_counter() - start)
+    best_wall = min(walls)
+    evaluations = scored_routines(optimizer.metadata)
+
+    tracemalloc.start()
+    create_optimizer(algorithm, problem, seed=seed).optimize(**budget)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'wall_ms': statistics.median(walls) * 1000,
+        'best_wall_ms': best_wall * 1000,
+        'evaluations': evaluations,
+        'evals_per_sec': evaluations / best_wall if best_wall > 0 else 0.0,
+        'best_fitness': float(fitness),
+        'peak_kb': peak / 1024
+    }
+
+
+def run_benchmark(algorithms, seeds, repeats):
+    """
+    Run every algorithm and budget on every synthetic problem.
+
+    Returns:
+        List of result rows, one per run
+    """
+    rows = []
+    for case_idx, num_courses in enumerate(COURSE_COUNTS):
+        dinner_hour = DINNER_HOURS[case_idx % len(DINNER_HOURS)]
+        problem = make_problem(num_courses, dinner_hour, seed=case_idx)
+        _, optimal_fitness = ExactOptimizer(problem).optimize()
+
+        for algorithm in algorithms:
+            for budget in BUDGETS[algorithm]:
+                for seed in seeds:
+                    result = run_once(algorithm, problem, budget, seed, repeats)
+                    rows.append({
+                        'algorithm': algorithm,
+                        'budget': json.dumps(budget, sort_keys=True),
+                        'courses': num_courses,
+                        'dinner_hour': dinner_hour,
+                        'seed': seed,
+                        'optimal_fitness': optimal_fitness,
+                        'gap': optimal_fitness - result['best_fitness'],
+                        **result
+                    })
+    return rows
+
+
+def summarize(rows):
+    """
+    Aggregate the runs per algorithm and budget.
+
+    Each summary entry is one point of the algorithm's quality-vs-time curve.
+
+    Returns:
+        Dictionary keyed by "algorithm budget" with median timings and fitness gap
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(f"{row['algorithm']} {row['budget']}", []).append(row)
+
+    summary = {}
+    for key, group in groups.items():
+        summary[key] = {
+            'algorithm': group[0]['algorithm'],
+            'runs': len(group),
+            'median_wall_ms': statistics.median(row['wall_ms'] for row in group),
+            'best_wall_ms': min(row['best_wall_ms'] for row in group),
+            'evals_per_sec': statistics.mean(row['evals_per_sec'] for row in group),
+            'mean_gap': statistics.mean(row['gap'] for row in group),
+            'optimal_rate': sum(row['gap'] <= 1e-9 for row in group) / len(group),
+            'max_peak_kb': max(row['peak_kb'] for row in group)
+        }
+    return summary
+
+
+def compare(summary, baseline, threshold):
+    """
+    Find throughput regressions against a stored baseline report.
+
+    Only the algorithms in THROUGHPUT_ALGORITHMS are compared.
+
+    Args:
+        summary: Summary of the current run
+        baseline: Summary of the baseline report
+        threshold: Allowed evaluations/sec drop, in percent
+
+    Returns:
+        List of (key, baseline evals/sec, current evals/sec, drop percent) tuples
+    """
+    regressions = []
+    for key, current in summary.items():
+        if current['algorithm'] not in THROUGHPUT_ALGORITHMS:
+            continue
+        previous = baseline.get(key)
+        if not previous or not previous['evals_per_sec']:
+            continue
+        drop = (1 - current['evals_per_sec'] / previous['evals_per_sec']) * 100
+        if drop > threshold:
+            regressions.append((key, previous['evals_per_sec'], current['evals_per_sec'], drop))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the routine optimizers.")
+    parser.add_argument('--algorithms', nargs='+', choices=sorted(BUDGETS), default=sorted(BUDGETS))
+    parser.add_argument('--seeds', type=int, default=3, help="number of seeds per run (default: 3)")
+    parser.add_argument('--repeats', type=int, default=5,
+                        help="timed repeats per run after one warm-up run (default: 5)")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--csv', help="write the individual runs to this CSV file")
+    parser.add_argument('--baseline', help="JSON report to compare the throughput against")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="allowed evaluations/sec drop against the baseline, in percent (default: 10)")
+    args = parser.parse_args(argv)
+
+    rows = run_benchmark(args.algorithms, range(args.seeds), max(args.repeats, 1))
+    summary = summarize(rows)
+
+    for key, entry in summary.items():
+        print(f"{key:<60} {entry['median_wall_ms']:9.1f} ms {entry['evals_per_sec']:11.0f} evals/s "
+              f"gap {entry['mean_gap']:6.2f} optimal {entry['optimal_rate']:4.0%} peak {entry['max_peak_kb']:8.0f} KB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'created_at': time.time(), 'summary': summary, 'runs': rows}, f, indent=2)
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['summary']
+        regressions = compare(summary, baseline, args.threshold)
+        for key, previous, current, drop in regressions:
+            print(f"REGRESSION {key}: {previous:.0f} -> {current:.0f} evals/s ({drop:.1f}% slower)")
+        if regressions:
+            return 1
+        print(f"No throughput regression beyond {args.threshold:g}% against {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
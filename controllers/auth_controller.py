@@ -3,7 +3,7 @@ from flask_login import login_user, current_user, logout_user, login_required
 from werkzeug.security import generate_password_hash, check_password_hash
 from models.user import User
 from models.course import CourseWeight, CourseDirectory
-from extensions import db
+from extensions import db, schedule_config
 from datetime import datetime, timedelta
 from sqlalchemy import func, distinct
 from utils.email_utils import send_verification_email, send_welcome_email, send_password_reset_email
@@ -191,9 +191,8 @@ def setup_courses():
         return redirect(url_for('auth.register'))
     
     # Get time slots
-    from controllers.main_controller import get_time_slots, get_days
-    time_slots = get_time_slots()
-    days = get_days()
+    time_slots = schedule_config.time_slots
+    days = schedule_config.days
     
     if request.method == 'POST':
         action = request.form.get('action')
@@ -238,7 +237,7 @@ def setup_courses():
                     continue
                 
                 # Find the selected time slot
-                selected_slot = next((slot for slot in time_slots if str(slot['id']) == slot_id), None)
+                selected_slot = schedule_config.slot(slot_id)
                 if not selected_slot:
                     continue
                 
@@ -248,6 +247,7 @@ def setup_courses():
                     'slot_id': slot_id,
                     'start_time': selected_slot['start'],
                     'end_time': selected_slot['end'],
+                    'slot': selected_slot,
                     'weight': course_weight.weight
                 })
             
@@ -283,8 +283,8 @@ def setup_courses():
                     actual_weight=course['weight'],
                     current_weight=course['weight'],
                     course_day=','.join(course['days']),
-                    course_time_start=datetime.strptime(course['start_time'], '%H:%M').time(),
-                    course_time_end=datetime.strptime(course['end_time'], '%H:%M').time()
+                    course_time_start=course['slot']['start_time'],
+                    course_time_end=course['slot']['end_time']
                 )
                 
                 db.session.add(course_dir)
@@ -1,20 +1,21 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, session, request, abort, jsonify, make_response
+from flask import Blueprint, render_template, redirect, url_for, flash, session, request, abort, jsonify, make_response, current_app
 from flask_login import login_required, current_user
 from models.user import User
 from models.course import CourseWeight, CourseDirectory
 from models.notification import Notification
 from models.message import Message
-from extensions import db
+from extensions import db, optimization_jobs, optimizer_pool, routine_cache, batch_optimizer, pdf_renderer, pdf_cache, schedule_config, reminder_scheduler
 from sqlalchemy import func, distinct
 import uuid
 from datetime import datetime, time, timedelta
-import pdfkit
-import tempfile
-import os
-import platform
 from werkzeug.security import check_password_hash, generate_password_hash
 from utils.email_utils import send_email
+from utils.routine_problem import RoutineProblem
+from utils.optimization_jobs import JobInProgressError, JobStatus, QueueFullError
+from utils.optimizers import ALGORITHMS, create_optimizer
+from utils.pdf_renderer import RendererUnavailableError, RendererBusyError, LAYOUT_VERSION
 from models.event import Event, EventType
+from models.optimized_routine import OptimizedRoutine
 
 main_bp = Blueprint('main', __name__)
 
@@ -28,52 +29,87 @@ def get_admin_stats():
     }
     return stats
 
-# Time slots for the guest routine
-def get_time_slots():
-    """Get time slots for the routine"""
-    return [
-        {"id": 1, "label": "08:00 - 09:30", "start": "08:00", "end": "09:30"},
-        {"id": 2, "label": "09:30 - 11:00", "start": "09:30", "end": "11:00"},
-        {"id": 3, "label": "11:00 - 12:30", "start": "11:00", "end": "12:30"},
-        {"id": 4, "label": "12:30 - 14:00", "start": "12:30", "end": "14:00"},
-        {"id": 5, "label": "14:00 - 15:30", "start": "14:00", "end": "15:30"},
-        {"id": 6, "label": "15:30 - 17:00", "start": "15:30", "end": "17:00"}
-    ]
-
-# Days of the week for the guest routine
-def get_days():
-    """Get days of the week for the routine"""
-    return ["Saturday", "Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
+# PDF downloads
+def render_pdf_response(template, filename, error_endpoint, **context):
+    """
+    Render a PDF template with the shared PDF renderer and return it as a download.
+    
+    PDFs are cached by a hash of their HTML, page layout and engine. The hash
+    is sent as the ETag, so a browser that already has the file gets a 304
+    and an unchanged routine is never rendered twice.
+    
+    Args:
+        template: PDF template to render (see templates/pdf)
+        filename: Name of the downloaded file
+        error_endpoint: Endpoint to redirect to if the PDF can not be rendered
+        **context: Variables passed to the template
+    """
+    html = render_template(template, **context)
+    etag = pdf_cache.make_key(html, LAYOUT_VERSION, pdf_renderer.engine)
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
+    
+    try:
+        pdf_data = pdf_cache.get(etag)
+        if pdf_data is None:
+            pdf_data = pdf_renderer.render(html)
+            pdf_cache.set(etag, pdf_data)
+    except RendererUnavailableError as e:
+        flash(str(e), 'warning')
+        flash('Visit https://wkhtmltopdf.org/downloads.html to download and install wkhtmltopdf.', 'info')
+        return redirect(url_for(error_endpoint))
+    except RendererBusyError as e:
+        flash(str(e), 'warning')
+        return redirect(url_for(error_endpoint))
+    except Exception as e:
+        flash(f'Error generating PDF: {str(e)}', 'danger')
+        return redirect(url_for(error_endpoint))
+    
+    response = make_response(pdf_data)
+    response.headers['Content-Type'] = 'application/pdf'
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.set_etag(etag)
+    return response
 
-# Guest routine theme colors
-def get_themes():
-    """Get color themes for the guest routine"""
-    return {
-        "blue": {
-            "name": "Blue Theme",
-            "primary": "#0d6efd",
-            "secondary": "#cfe2ff",
-            "text": "#0a58ca",
-            "header": "#0a58ca",
-            "header_text": "#ffffff"
-        },
-        "green": {
-            "name": "Green Theme",
-            "primary": "#198754",
-            "secondary": "#d1e7dd",
-            "text": "#0f5132",
-            "header": "#0f5132",
-            "header_text": "#ffffff"
-        },
-        "purple": {
-            "name": "Purple Theme",
-            "primary": "#6f42c1",
-            "secondary": "#e2d9f3",
-            "text": "#5a23c8",
-            "header": "#5a23c8",
-            "header_text": "#ffffff"
+# Optimizer settings from the app configuration
+def get_optimizer_settings(algorithm):
+    """
+    Get the optimize() arguments and the optimizer options of an algorithm.
+    
+    Returns:
+        Tuple of the params and options dictionaries; together they make up
+        the search budget used in routine cache keys
+    """
+    config = current_app.config
+    if algorithm == 'genetic':
+        params = {
+            'population_size': config['GA_POPULATION_SIZE'],
+            'generations': config['GA_GENERATIONS'],
+            'islands': config['GA_ISLANDS'],
+            'migration_interval': config['GA_MIGRATION_INTERVAL'],
+            'time_budget_ms': config['OPTIMIZER_TIME_BUDGET_MS'],
+            'patience': config['OPTIMIZER_PATIENCE']
         }
-    }
+        options = {}
+    elif algorithm == 'exact':
+        params = {}
+        options = {}
+    else:  # ant_colony
+        params = {
+            'iterations': config['ACO_ITERATIONS'],
+            'time_budget_ms': config['OPTIMIZER_TIME_BUDGET_MS'],
+            'patience': config['OPTIMIZER_PATIENCE']
+        }
+        options = {'deposit_strategy': config['ACO_DEPOSIT_STRATEGY']}
+    return params, options
+
+def save_optimizer_preferences(algorithm, dinner_hour):
+    """Remember the settings of an accepted optimization request for the form."""
+    session['optimization_algorithm'] = algorithm
+    session['dinner_hour'] = dinner_hour
 
 # Regular routes
 @main_bp.route('/')
@@ -96,37 +132,16 @@ def dashboard():
     courses = CourseDirectory.query.filter_by(student_id=current_user.id).all()
     
     # Get time slots and days
-    time_slots = get_time_slots()
-    days = get_days()
+    time_slots = schedule_config.time_slots
+    days = schedule_config.days
     
     # Get user's theme preference or use default
     theme_name = session.get('user_theme', 'blue')
-    themes = get_themes()
+    themes = schedule_config.themes
     theme = themes[theme_name]
     
-    # Generate routine grid
-    routine = {}
-    for day in days:
-        routine[day] = {}
-        for slot in time_slots:
-            routine[day][f"{slot['start']}-{slot['end']}"] = []
-    
-    # Fill the routine grid with courses
-    for course in courses:
-        course_days = course.course_day.split(',')
-        for day in course_days:
-            start_time = course.course_time_start.strftime('%H:%M')
-            end_time = course.course_time_end.strftime('%H:%M')
-            
-            # Only add the course to the exact matching time slot
-            for slot in time_slots:
-                if start_time == slot['start'] and end_time == slot['end']:
-                    routine[day][f"{slot['start']}-{slot['end']}"].append({
-                        'course_code': course.course_code,
-                        'start_time': start_time,
-                        'end_time': end_time
-                    })
-                    break
+    # Place the courses in the day x time-slot grid
+    routine = schedule_config.routine_grid.for_user(current_user.id, courses)
     
     # Get upcoming events (placeholder for now)
     events = []
@@ -151,8 +166,8 @@ def profile():
     courses = CourseDirectory.query.filter_by(student_id=current_user.id).all()
     
     # Get time slots and days for course management
-    time_slots = get_time_slots()
-    days = get_days()
+    time_slots = schedule_config.time_slots
+    days = schedule_config.days
     
     # Get available courses for the user's department
     available_courses = CourseWeight.query.filter_by(department=current_user.department).all()
@@ -210,8 +225,8 @@ def guest_course_input():
         return redirect(url_for('main.guest_routine_setup'))
     
     course_count = session['guest_course_count']
-    days = get_days()
-    time_slots = get_time_slots()
+    days = schedule_config.days
+    time_slots = schedule_config.time_slots
     
     if request.method == 'POST':
         courses = []
@@ -227,7 +242,7 @@ def guest_course_input():
                 return redirect(url_for('main.guest_course_input'))
             
             # Find the selected time slot
-            selected_slot = next((slot for slot in time_slots if str(slot['id']) == slot_id), None)
+            selected_slot = schedule_config.slot(slot_id)
             if not selected_slot:
                 flash(f'Invalid time slot selected for Course {i}.', 'danger')
                 return redirect(url_for('main.guest_course_input'))
@@ -275,30 +290,13 @@ def guest_routine_view():
         return redirect(url_for('main.guest_routine_setup'))
     
     courses = session['guest_courses']
-    days = get_days()
-    time_slots = get_time_slots()
+    days = schedule_config.days
+    time_slots = schedule_config.time_slots
     theme = session.get('guest_theme', 'blue')
-    themes = get_themes()
-    
-    # Generate routine grid
-    routine = {}
-    for day in days:
-        routine[day] = {}
-        for slot in time_slots:
-            routine[day][f"{slot['start']}-{slot['end']}"] = []
-    
-    # Fill the routine grid with courses
-    for course in courses:
-        for day in course['days']:
-            # Only add the course to the exact matching time slot
-            for slot in time_slots:
-                if course['start_time'] == slot['start'] and course['end_time'] == slot['end']:
-                    routine[day][f"{slot['start']}-{slot['end']}"].append({
-                        'course_code': course['course_code'],
-                        'start_time': course['start_time'],
-                        'end_time': course['end_time']
-                    })
-                    break
+    themes = schedule_config.themes
+    
+    # Place the courses in the day x time-slot grid
+    routine = schedule_config.routine_grid.build(courses)
     
     return render_template('guest/routine_view.html', 
                           routine=routine, 
@@ -314,7 +312,7 @@ def guest_set_theme(theme):
         flash('You need to be in guest mode to access this page.', 'warning')
         return redirect(url_for('main.home'))
     
-    themes = get_themes()
+    themes = schedule_config.themes
     if theme in themes:
         session['guest_theme'] = theme
     
@@ -328,193 +326,20 @@ def guest_routine_pdf():
         return redirect(url_for('main.guest_routine_setup'))
     
     courses = session['guest_courses']
-    days = get_days()
-    time_slots = get_time_slots()
+    days = schedule_config.days
+    time_slots = schedule_config.time_slots
     theme = session.get('guest_theme', 'blue')
-    themes = get_themes()
-    
-    # Generate routine grid (same as in guest_routine_view)
-    routine = {}
-    for day in days:
-        routine[day] = {}
-        for slot in time_slots:
-            routine[day][f"{slot['start']}-{slot['end']}"] = []
-    
-    # Fill the routine grid with courses
-    for course in courses:
-        for day in course['days']:
-            # Only add the course to the exact matching time slot
-            for slot in time_slots:
-                if course['start_time'] == slot['start'] and course['end_time'] == slot['end']:
-                    routine[day][f"{slot['start']}-{slot['end']}"].append({
-                        'course_code': course['course_code'],
-                        'start_time': course['start_time'],
-                        'end_time': course['end_time']
-                    })
-                    break
-    
-    # Get the current theme colors
-    theme_data = themes[theme]
-    
-    # Generate static HTML for PDF without template variables in CSS
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>Class Routine</title>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                margin: 0;
-                padding: 20px;
-            }}
-            h1 {{
-                color: {theme_data['header']};
-                text-align: center;
-                margin-bottom: 20px;
-            }}
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin-bottom: 30px;
-            }}
-            th, td {{
-                border: 1px solid #ddd;
-                padding: 8px;
-                text-align: center;
-            }}
-            th {{
-                background-color: {theme_data['header']};
-                color: {theme_data['header_text']};
-            }}
-            .time-cell {{
-                background-color: {theme_data['secondary']};
-                color: {theme_data['text']};
-                font-weight: bold;
-            }}
-            .course-cell {{
-                background-color: {theme_data['secondary']};
-            }}
-            .course {{
-                background-color: {theme_data['primary']};
-                color: white;
-                padding: 5px;
-                margin-bottom: 5px;
-                border-radius: 3px;
-            }}
-            .footer {{
-                text-align: center;
-                margin-top: 30px;
-                font-size: 12px;
-                color: #666;
-            }}
-        </style>
-    </head>
-    <body>
-        <h1>Class Routine</h1>
-        
-        <table>
-            <thead>
-                <tr>
-                    <th style="width: 15%;">Time</th>
-    """
+    themes = schedule_config.themes
     
-    # Add days to the header
-    for day in days:
-        html += f'<th style="width: 14%;">{day}</th>\n'
+    # Place the courses in the day x time-slot grid
+    routine = schedule_config.routine_grid.build(courses)
     
-    html += """
-                </tr>
-            </thead>
-            <tbody>
-    """
-    
-    # Add the time slots and courses
-    for slot in time_slots:
-        html += f'<tr>\n<td class="time-cell">{slot["start"]} - {slot["end"]}</td>\n'
-        
-        for day in days:
-            slot_key = f"{slot['start']}-{slot['end']}"
-            courses_in_slot = routine[day].get(slot_key, [])
-            
-            if courses_in_slot:
-                html += '<td class="course-cell">\n'
-                for course in courses_in_slot:
-                    html += f"""
-                    <div class="course">
-                        {course['course_code']}<br>
-                        <small>{course['start_time']} - {course['end_time']}</small>
-                    </div>
-                    """
-                html += '</td>\n'
-            else:
-                html += '<td></td>\n'
-                
-        html += '</tr>\n'
-    
-    html += f"""
-            </tbody>
-        </table>
-        
-        <div class="footer">
-            Generated by Schedule Planner - {theme_data['name']}
-        </div>
-    </body>
-    </html>
-    """
-    
-    # Convert HTML to PDF
-    try:
-        options = {
-            'page-size': 'A4',
-            'margin-top': '0.75in',
-            'margin-right': '0.75in',
-            'margin-bottom': '0.75in',
-            'margin-left': '0.75in',
-            'encoding': 'UTF-8',
-        }
-        
-        # Try to find wkhtmltopdf executable
-        config = None
-        if platform.system() == 'Windows':
-            # Try common locations on Windows
-            import os
-            wkhtmltopdf_paths = [
-                r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe',
-                r'C:\Program Files (x86)\wkhtmltopdf\bin\wkhtmltopdf.exe'
-            ]
-            
-            for path in wkhtmltopdf_paths:
-                if os.path.exists(path):
-                    config = pdfkit.configuration(wkhtmltopdf=path)
-                    break
-        
-        if config:
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
-                pdfkit.from_string(html, f.name, options=options, configuration=config)
-                pdf_path = f.name
-            
-            with open(pdf_path, 'rb') as f:
-                pdf_data = f.read()
-            
-            # Cleanup the temporary file
-            os.unlink(pdf_path)
-            
-            response = make_response(pdf_data)
-            response.headers['Content-Type'] = 'application/pdf'
-            response.headers['Content-Disposition'] = 'attachment; filename=class_routine.pdf'
-            return response
-        else:
-            flash('wkhtmltopdf executable not found. Please install wkhtmltopdf to enable PDF downloads.', 'warning')
-            flash('Visit https://wkhtmltopdf.org/downloads.html to download and install.', 'info')
-            return redirect(url_for('main.guest_routine_view'))
-            
-    except Exception as e:
-        flash(f'Error generating PDF: {str(e)}', 'danger')
-        flash('To enable PDF downloads, please install wkhtmltopdf from https://wkhtmltopdf.org/downloads.html', 'info')
-        return redirect(url_for('main.guest_routine_view'))
+    return render_pdf_response('pdf/class_routine.html', 'class_routine.pdf', 'main.guest_routine_view',
+                               title='Class Routine',
+                               theme=themes[theme],
+                               routine=routine,
+                               days=days,
+                               time_slots=time_slots)
 
 @main_bp.route('/guest/reset')
 def guest_reset():
@@ -620,6 +445,9 @@ def admin_ban_user():
                 # Delete notifications
                 Notification.query.filter_by(user_id=user.id).delete()
                 
+                # Delete the saved optimized routine
+                OptimizedRoutine.query.filter_by(user_id=user.id).delete()
+                
                 # Delete messages
                 Message.query.filter(
                     (Message.sender_id == user.id) | (Message.receiver_id == user.id)
@@ -886,7 +714,25 @@ def admin_view_department(department_name):
         flash(f'Department "{department_name}" not found or has no courses.', 'warning')
         return redirect(url_for('main.admin_departments'))
     
-    return render_template('admin/view_department.html', department_name=department_name, courses=courses)
+    # Follow the batch re-optimization started by a course edit
+    pending_batch = None
+    batch_id = session.get('batch_optimization_id')
+    if batch_id:
+        batch = batch_optimizer.get(batch_id)
+        if batch is None:
+            session.pop('batch_optimization_id', None)
+        elif batch.status == JobStatus.COMPLETED:
+            session.pop('batch_optimization_id', None)
+            flash(f'Re-optimized the routines of {batch.completed} of {batch.total} students ({batch.description}).',
+                  'warning' if batch.failed else 'success')
+        elif batch.status == JobStatus.FAILED:
+            session.pop('batch_optimization_id', None)
+            flash(f'Error re-optimizing routines: {batch.error}', 'danger')
+        else:
+            pending_batch = batch
+    
+    return render_template('admin/view_department.html', department_name=department_name, courses=courses,
+                           pending_batch=pending_batch)
 
 @main_bp.route('/admin/department/<department_name>/add-course', methods=['GET', 'POST'])
 @login_required
@@ -958,23 +804,105 @@ def admin_edit_course(course_id):
                 return redirect(url_for('main.admin_edit_course', course_id=course_id))
         
         try:
+            old_course_code = course.course_code
+            weight_change = course_weight - course.weight
+            
             # Update the course
             course.course_code = course_code
             course.weight = course_weight
             course.updated_at = datetime.utcnow()
             
+            # Carry the change over to every enrollment in one statement,
+            # keeping the event adjustments of each student's current weight
+            enrolled = CourseDirectory.query.filter_by(course_code=old_course_code).update({
+                CourseDirectory.course_code: course_code,
+                CourseDirectory.actual_weight: course_weight,
+                CourseDirectory.current_weight: CourseDirectory.current_weight + weight_change
+            }, synchronize_session=False)
+            
             db.session.commit()
             
             flash(f'Successfully updated course {course_code}.', 'success')
-            return redirect(url_for('main.admin_view_department', department_name=department_name))
             
         except Exception as e:
             db.session.rollback()
             flash(f'Error updating course: {str(e)}', 'danger')
             return redirect(url_for('main.admin_edit_course', course_id=course_id))
+        
+        # Every enrolled student's routine is stale now; the update is
+        # committed, so a failure here must not be reported as an update error
+        if enrolled and weight_change:
+            try:
+                batch = reoptimize_course_students(course_code)
+                session['batch_optimization_id'] = batch.id
+                flash(f'Re-optimizing the routines of {batch.total} enrolled students in the background.', 'info')
+            except Exception as e:
+                flash(f'Could not re-optimize the enrolled students\' routines: {str(e)}', 'warning')
+        
+        return redirect(url_for('main.admin_view_department', department_name=department_name))
     
     return render_template('admin/edit_course.html', course=course)
 
+def reoptimize_course_students(course_code):
+    """
+    Queue a batch re-optimization of every student enrolled in a course.
+    
+    All course rows of the affected students are loaded with a single query
+    and snapshotted before the batch starts, keeping each student's dinner
+    hour and algorithm from their saved routine. Results are saved as the
+    students' optimized routines and stored in the routine cache.
+    
+    Returns:
+        The BatchOptimization
+    """
+    enrolled_students = db.session.query(CourseDirectory.student_id).filter_by(course_code=course_code)
+    rows = CourseDirectory.query.filter(CourseDirectory.student_id.in_(enrolled_students)).all()
+    
+    courses_by_student = {}
+    for row in rows:
+        courses_by_student.setdefault(row.student_id, []).append(row)
+    
+    saved_routines = {saved.user_id: saved for saved in
+                      OptimizedRoutine.query.filter(OptimizedRoutine.user_id.in_(enrolled_students)).all()}
+    
+    days = schedule_config.days
+    problems = {}
+    algorithms = {}
+    for student_id, courses in courses_by_student.items():
+        saved = saved_routines.get(student_id)
+        problems[student_id] = RoutineProblem.from_courses(courses, dinner_hour=saved.dinner_hour if saved else 8, days=days)
+        algorithms[student_id] = saved.algorithm if saved and saved.algorithm in ALGORITHMS else 'genetic'
+    
+    settings = {}
+    cache_params = {}
+    for algorithm in set(algorithms.values()):
+        params, options = get_optimizer_settings(algorithm)
+        cache_params[algorithm] = {**params, **options}
+        settings[algorithm] = (params, {**options, 'seed': current_app.config['OPTIMIZER_SEED']})
+    
+    def store(user_id, problem, routine, fitness_score, metadata):
+        algorithm = algorithms[user_id]
+        OptimizedRoutine.save_for_user(user_id, problem, routine, fitness_score, algorithm,
+                                       params=settings[algorithm][0], metadata=metadata)
+        routine_cache.invalidate_user(user_id)
+        routine_cache.set(routine_cache.make_key(problem, algorithm, cache_params[algorithm]),
+                          routine, fitness_score, user_id=user_id)
+    
+    return batch_optimizer.submit(f'Course {course_code} updated', problems, algorithms, settings,
+                                  on_result=store)
+
+@main_bp.route('/admin/batch-optimizations/<batch_id>')
+@login_required
+def batch_optimization_status(batch_id):
+    if current_user.user_type != 'admin':
+        abort(403)
+    
+    batch = batch_optimizer.get(batch_id)
+    if batch is None:
+        abort(404)
+    
+    return jsonify(batch.to_dict())
+
 @main_bp.route('/admin/department/delete-course/<int:course_id>', methods=['POST'])
 @login_required
 def admin_delete_course(course_id):
@@ -1056,7 +984,7 @@ def admin_delete_department(department_name):
 @main_bp.route('/set-theme/<theme>')
 @login_required
 def set_theme(theme):
-    themes = get_themes()
+    themes = schedule_config.themes
     if theme in themes:
         session['user_theme'] = theme
     
@@ -1145,8 +1073,7 @@ def add_course():
         return redirect(url_for('main.profile'))
     
     # Get time slot
-    time_slots = get_time_slots()
-    selected_slot = next((slot for slot in time_slots if str(slot['id']) == course_time), None)
+    selected_slot = schedule_config.slot(course_time)
     if not selected_slot:
         flash('Invalid time slot.', 'danger')
         return redirect(url_for('main.profile'))
@@ -1169,8 +1096,8 @@ def add_course():
         common_days = set(course_days).intersection(set(user_course_days))
         
         if common_days:
-            start_time = datetime.strptime(selected_slot['start'], '%H:%M').time()
-            end_time = datetime.strptime(selected_slot['end'], '%H:%M').time()
+            start_time = selected_slot['start_time']
+            end_time = selected_slot['end_time']
             
             if (start_time == user_course.course_time_start and 
                 end_time == user_course.course_time_end):
@@ -1185,12 +1112,13 @@ def add_course():
         actual_weight=course_weight.weight,
         current_weight=course_weight.weight,
         course_day=','.join(course_days),
-        course_time_start=datetime.strptime(selected_slot['start'], '%H:%M').time(),
-        course_time_end=datetime.strptime(selected_slot['end'], '%H:%M').time()
+        course_time_start=selected_slot['start_time'],
+        course_time_end=selected_slot['end_time']
     )
     
     db.session.add(new_course)
     db.session.commit()
+    routine_cache.invalidate_user(current_user.id)
     
     flash(f'Course {course_code} added successfully!', 'success')
     flash(f'Remember to re-optimize your routine to reflect the updated course weights.', 'info')
@@ -1218,8 +1146,7 @@ def update_course(course_id):
         return redirect(url_for('main.profile'))
     
     # Get time slot
-    time_slots = get_time_slots()
-    selected_slot = next((slot for slot in time_slots if str(slot['id']) == course_time), None)
+    selected_slot = schedule_config.slot(course_time)
     if not selected_slot:
         flash('Invalid time slot.', 'danger')
         return redirect(url_for('main.profile'))
@@ -1235,8 +1162,8 @@ def update_course(course_id):
         common_days = set(course_days).intersection(set(user_course_days))
         
         if common_days:
-            start_time = datetime.strptime(selected_slot['start'], '%H:%M').time()
-            end_time = datetime.strptime(selected_slot['end'], '%H:%M').time()
+            start_time = selected_slot['start_time']
+            end_time = selected_slot['end_time']
             
             if (start_time == user_course.course_time_start and 
                 end_time == user_course.course_time_end):
@@ -1246,10 +1173,11 @@ def update_course(course_id):
     # Update course
     course.current_weight = course_weight
     course.course_day = ','.join(course_days)
-    course.course_time_start = datetime.strptime(selected_slot['start'], '%H:%M').time()
-    course.course_time_end = datetime.strptime(selected_slot['end'], '%H:%M').time()
+    course.course_time_start = selected_slot['start_time']
+    course.course_time_end = selected_slot['end_time']
     
     db.session.commit()
+    routine_cache.invalidate_user(current_user.id)
     
     flash(f'Course {course.course_code} updated successfully!', 'success')
     flash(f'Remember to re-optimize your routine to reflect the updated course weights.', 'info')
@@ -1272,6 +1200,7 @@ def delete_course(course_id):
     
     db.session.delete(course)
     db.session.commit()
+    routine_cache.invalidate_user(current_user.id)
     
     flash(f'Course {course_code} deleted successfully!', 'success')
     flash(f'Remember to re-optimize your routine to reflect the updated course weights.', 'info')
@@ -1287,197 +1216,24 @@ def download_routine_pdf():
     courses = CourseDirectory.query.filter_by(student_id=current_user.id).all()
     
     # Get time slots and days
-    time_slots = get_time_slots()
-    days = get_days()
+    time_slots = schedule_config.time_slots
+    days = schedule_config.days
     
     # Get user's theme preference or use default
     theme_name = session.get('user_theme', 'blue')
-    themes = get_themes()
+    themes = schedule_config.themes
     theme = themes[theme_name]
     
-    # Generate routine grid
-    routine = {}
-    for day in days:
-        routine[day] = {}
-        for slot in time_slots:
-            routine[day][f"{slot['start']}-{slot['end']}"] = []
-    
-    # Fill the routine grid with courses
-    for course in courses:
-        course_days = course.course_day.split(',')
-        for day in course_days:
-            start_time = course.course_time_start.strftime('%H:%M')
-            end_time = course.course_time_end.strftime('%H:%M')
-            
-            # Only add the course to the exact matching time slot
-            for slot in time_slots:
-                if start_time == slot['start'] and end_time == slot['end']:
-                    routine[day][f"{slot['start']}-{slot['end']}"].append({
-                        'course_code': course.course_code,
-                        'start_time': start_time,
-                        'end_time': end_time
-                    })
-                    break
-    
-    # Generate static HTML for PDF without template variables in CSS
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>Class Routine - {current_user.name}</title>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                margin: 0;
-                padding: 20px;
-            }}
-            h1 {{
-                color: {theme['header']};
-                text-align: center;
-                margin-bottom: 20px;
-            }}
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin-bottom: 30px;
-            }}
-            th, td {{
-                border: 1px solid #ddd;
-                padding: 8px;
-                text-align: center;
-            }}
-            th {{
-                background-color: {theme['header']};
-                color: {theme['header_text']};
-            }}
-            .time-cell {{
-                background-color: {theme['secondary']};
-                color: {theme['text']};
-                font-weight: bold;
-            }}
-            .course-cell {{
-                background-color: {theme['secondary']};
-            }}
-            .course {{
-                background-color: {theme['primary']};
-                color: white;
-                padding: 5px;
-                margin-bottom: 5px;
-                border-radius: 3px;
-            }}
-            .footer {{
-                text-align: center;
-                margin-top: 30px;
-                font-size: 12px;
-                color: #666;
-            }}
-        </style>
-    </head>
-    <body>
-        <h1>Class Routine - {current_user.name}</h1>
-        
-        <table>
-            <thead>
-                <tr>
-                    <th style="width: 15%;">Time</th>
-    """
-    
-    # Add days to the header
-    for day in days:
-        html += f'<th style="width: 14%;">{day}</th>\n'
-    
-    html += """
-                </tr>
-            </thead>
-            <tbody>
-    """
+    # Place the courses in the day x time-slot grid
+    routine = schedule_config.routine_grid.for_user(current_user.id, courses)
     
-    # Add the time slots and courses
-    for slot in time_slots:
-        html += f'<tr>\n<td class="time-cell">{slot["start"]} - {slot["end"]}</td>\n'
-        
-        for day in days:
-            slot_key = f"{slot['start']}-{slot['end']}"
-            courses_in_slot = routine[day].get(slot_key, [])
-            
-            if courses_in_slot:
-                html += '<td class="course-cell">\n'
-                for course in courses_in_slot:
-                    html += f"""
-                    <div class="course">
-                        {course['course_code']}<br>
-                        <small>{course['start_time']} - {course['end_time']}</small>
-                    </div>
-                    """
-                html += '</td>\n'
-            else:
-                html += '<td></td>\n'
-                
-        html += '</tr>\n'
-    
-    html += f"""
-            </tbody>
-        </table>
-        
-        <div class="footer">
-            Generated by Schedule Planner - {current_user.department} - {theme['name']}
-        </div>
-    </body>
-    </html>
-    """
-    
-    # Convert HTML to PDF
-    try:
-        options = {
-            'page-size': 'A4',
-            'margin-top': '0.75in',
-            'margin-right': '0.75in',
-            'margin-bottom': '0.75in',
-            'margin-left': '0.75in',
-            'encoding': 'UTF-8',
-        }
-        
-        # Try to find wkhtmltopdf executable
-        config = None
-        if platform.system() == 'Windows':
-            # Try common locations on Windows
-            import os
-            wkhtmltopdf_paths = [
-                r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe',
-                r'C:\Program Files (x86)\wkhtmltopdf\bin\wkhtmltopdf.exe'
-            ]
-            
-            for path in wkhtmltopdf_paths:
-                if os.path.exists(path):
-                    config = pdfkit.configuration(wkhtmltopdf=path)
-                    break
-        
-        if config:
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
-                pdfkit.from_string(html, f.name, options=options, configuration=config)
-                pdf_path = f.name
-            
-            with open(pdf_path, 'rb') as f:
-                pdf_data = f.read()
-            
-            # Cleanup the temporary file
-            os.unlink(pdf_path)
-            
-            response = make_response(pdf_data)
-            response.headers['Content-Type'] = 'application/pdf'
-            response.headers['Content-Disposition'] = f'attachment; filename=class_routine_{current_user.student_id}.pdf'
-            return response
-        else:
-            flash('wkhtmltopdf executable not found. Please install wkhtmltopdf to enable PDF downloads.', 'warning')
-            flash('Visit https://wkhtmltopdf.org/downloads.html to download and install.', 'info')
-            return redirect(url_for('main.dashboard'))
-            
-    except Exception as e:
-        flash(f'Error generating PDF: {str(e)}', 'danger')
-        flash('To enable PDF downloads, please install wkhtmltopdf from https://wkhtmltopdf.org/downloads.html', 'info')
-        return redirect(url_for('main.dashboard'))
+    return render_pdf_response('pdf/class_routine.html', f'class_routine_{current_user.student_id}.pdf', 'main.dashboard',
+                               title=f'Class Routine - {current_user.name}',
+                               theme=theme,
+                               department=current_user.department,
+                               routine=routine,
+                               days=days,
+                               time_slots=time_slots)
 
 @main_bp.route('/optimized-routine')
 @login_required
@@ -1494,17 +1250,37 @@ def optimized_routine():
     
     # Get theme and days
     theme_name = session.get('user_theme', 'blue')
-    themes = get_themes()
+    themes = schedule_config.themes
     theme = themes[theme_name]
-    days = get_days()
+    days = schedule_config.days
+    
+    # Pick up the result of a background optimization job
+    pending_job = None
+    job_id = session.get('optimization_job_id')
+    if job_id:
+        job = optimization_jobs.get(job_id)
+        if job is None or job.user_id != current_user.id:
+            session.pop('optimization_job_id', None)
+        elif job.status == JobStatus.COMPLETED:
+            session.pop('optimization_job_id', None)
+            flash(f'Optimized routine generated successfully using {job.algorithm.replace("_", " ").title()} algorithm!', 'success')
+        elif job.status == JobStatus.FAILED:
+            session.pop('optimization_job_id', None)
+            flash(f'Error generating optimized routine: {job.error}', 'danger')
+        else:
+            pending_job = job
     
-    # Get current algorithm and dinner hour from session, or use defaults
-    algorithm = session.get('optimization_algorithm', 'genetic')
-    dinner_hour = session.get('dinner_hour', 8)
+    # Get the saved optimized routine if it exists
+    saved = OptimizedRoutine.query.filter_by(user_id=current_user.id).first()
+    optimized_routine = saved.routine if saved else {}
+    fitness_score = saved.fitness_score if saved else None
     
-    # Get optimized routine from session if it exists
-    optimized_routine = session.get('optimized_routine', {})
-    fitness_score = session.get('fitness_score')
+    # Get current algorithm and dinner hour from session, or from the saved routine
+    algorithm = session.get('optimization_algorithm', saved.algorithm if saved else 'genetic')
+    dinner_hour = session.get('dinner_hour', saved.dinner_hour if saved else 8)
+    
+    # The table shows the dinner hour the saved routine was optimized for
+    routine_dinner_hour = saved.dinner_hour if saved else dinner_hour
     
     # Get upcoming events for the user
     upcoming_events = Event.query.filter_by(
@@ -1521,8 +1297,10 @@ def optimized_routine():
                           theme_name=theme_name,
                           algorithm=algorithm,
                           dinner_hour=dinner_hour,
+                          routine_dinner_hour=routine_dinner_hour,
                           optimized_routine=optimized_routine,
                           fitness_score=fitness_score,
+                          pending_job=pending_job,
                           upcoming_events=upcoming_events)
 
 @main_bp.route('/generate-optimized-routine', methods=['POST'])
@@ -1533,11 +1311,16 @@ def generate_optimized_routine():
     
     # Get form data
     algorithm = request.form.get('algorithm', 'genetic')
+    if algorithm not in ALGORITHMS:
+        algorithm = 'genetic'
     dinner_hour = int(request.form.get('dinner_hour', 8))
     
-    # Save preferences to session
-    session['optimization_algorithm'] = algorithm
-    session['dinner_hour'] = dinner_hour
+    # One optimization per user at a time; keep the running job's settings
+    active_job = optimization_jobs.active_job(current_user.id)
+    if active_job is not None:
+        session['optimization_job_id'] = active_job.id
+        flash(str(JobInProgressError(active_job)), 'warning')
+        return redirect(url_for('main.optimized_routine'))
     
     # Get a FRESH copy of user's courses directly from database to ensure up-to-date weights
     courses = CourseDirectory.query.filter_by(student_id=current_user.id).all()
@@ -1547,37 +1330,77 @@ def generate_optimized_routine():
         return redirect(url_for('main.optimized_routine'))
     
     # Get the days to optimize (starting from current day)
-    days = get_days()
+    days = schedule_config.days
+    
+    # Snapshot the course data once so the optimizers never touch ORM objects
+    problem = RoutineProblem.from_courses(courses, dinner_hour=dinner_hour, days=days)
+    
+    # Choose the appropriate optimizer
+    params, options = get_optimizer_settings(algorithm)
+    optimizer = create_optimizer(algorithm, problem, pool=optimizer_pool,
+                                 seed=current_app.config['OPTIMIZER_SEED'], **options)
+    cache_params = {**params, **options}
+    
+    # Reuse the result of an identical earlier request
+    cache_key = routine_cache.make_key(problem, algorithm, cache_params)
+    cached = routine_cache.get(cache_key)
+    if cached:
+        OptimizedRoutine.save_for_user(current_user.id, problem, *cached, algorithm, params=params)
+        save_optimizer_preferences(algorithm, dinner_hour)
+        session.pop('optimization_job_id', None)
+        flash(f'Optimized routine generated successfully using {algorithm.replace("_", " ").title()} algorithm!', 'success')
+        return redirect(url_for('main.optimized_routine'))
     
+    user_id = current_user.id
+    
+    # Warm-start from the previous routine if it was built for the same
+    # courses, days and dinner hour (typically only a weight has changed)
+    initial_solution = None
+    saved = OptimizedRoutine.query.filter_by(user_id=user_id).first()
+    if saved and saved.layout_fingerprint == problem.layout_fingerprint():
+        initial_solution = problem.encode(saved.routine)
+    
+    def run():
+        optimized_routine, fitness_score = optimizer.optimize(**params, initial_solution=initial_solution)
+        OptimizedRoutine.save_for_user(user_id, problem, optimized_routine, fitness_score, algorithm,
+                                       params=params, metadata=optimizer.metadata)
+        routine_cache.set(cache_key, optimized_routine, fitness_score, user_id=user_id)
+        return optimized_routine, fitness_score, optimizer.metadata
+    
+    # Run the search in the background so the request returns immediately
     try:
-        # Choose the appropriate optimizer
-        if algorithm == 'genetic':
-            from utils.genetic_optimizer import GeneticOptimizer
-            optimizer = GeneticOptimizer(courses, dinner_hour=dinner_hour, days=days)
-            optimized_routine, fitness_score = optimizer.optimize(population_size=50, generations=40)
-        else:  # ant_colony
-            from utils.ant_colony_optimizer import AntColonyOptimizer
-            optimizer = AntColonyOptimizer(courses, dinner_hour=dinner_hour, days=days)
-            optimized_routine, fitness_score = optimizer.optimize(iterations=30)
-        
-        # Store the result in session
-        session['optimized_routine'] = optimized_routine
-        session['fitness_score'] = fitness_score
-        
-        flash(f'Optimized routine generated successfully using {algorithm.replace("_", " ").title()} algorithm!', 'success')
-    except Exception as e:
-        flash(f'Error generating optimized routine: {str(e)}', 'danger')
+        job = optimization_jobs.submit(user_id, algorithm, run, params=params)
+        save_optimizer_preferences(algorithm, dinner_hour)
+        session['optimization_job_id'] = job.id
+        flash('Your optimized routine is being generated. This page will update when it is ready.', 'info')
+    except JobInProgressError as e:
+        session['optimization_job_id'] = e.job.id
+        flash(str(e), 'warning')
+    except QueueFullError as e:
+        flash(str(e), 'warning')
     
     return redirect(url_for('main.optimized_routine'))
 
+@main_bp.route('/optimization-jobs/<job_id>')
+@login_required
+def optimization_job_status(job_id):
+    job = optimization_jobs.get(job_id)
+    
+    # Only the owner may see a job
+    if job is None or job.user_id != current_user.id:
+        abort(404)
+    
+    return jsonify(job.to_dict())
+
 @main_bp.route('/download-optimized-routine-pdf')
 @login_required
 def download_optimized_routine_pdf():
     if current_user.user_type == 'admin':
         return redirect(url_for('main.admin_dashboard'))
     
-    # Get optimized routine from session
-    optimized_routine = session.get('optimized_routine', {})
+    # Get the saved optimized routine
+    saved = OptimizedRoutine.query.filter_by(user_id=current_user.id).first()
+    optimized_routine = saved.routine if saved else {}
     
     if not optimized_routine:
         flash('No optimized routine to download. Please generate one first.', 'warning')
@@ -1585,168 +1408,17 @@ def download_optimized_routine_pdf():
     
     # Get theme and days
     theme_name = session.get('user_theme', 'blue')
-    themes = get_themes()
+    themes = schedule_config.themes
     theme = themes[theme_name]
-    days = get_days()
-    
-    # Get dinner hour
-    dinner_hour = session.get('dinner_hour', 8)
-    
-    # Generate static HTML for PDF
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>Optimized Study Routine - {current_user.name}</title>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                margin: 0;
-                padding: 20px;
-            }}
-            h1 {{
-                color: {theme['header']};
-                text-align: center;
-                margin-bottom: 20px;
-            }}
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin-bottom: 30px;
-            }}
-            th, td {{
-                border: 1px solid #ddd;
-                padding: 8px;
-                text-align: center;
-            }}
-            th {{
-                background-color: {theme['header']};
-                color: {theme['header_text']};
-            }}
-            .time-cell {{
-                background-color: {theme['secondary']};
-                color: {theme['text']};
-                font-weight: bold;
-            }}
-            .course-cell {{
-                background-color: {theme['primary']};
-                color: white;
-                padding: 5px;
-                border-radius: 3px;
-            }}
-            .dinner-cell {{
-                background-color: #fff3cd;
-                color: #664d03;
-                font-weight: 500;
-            }}
-            .footer {{
-                text-align: center;
-                margin-top: 30px;
-                font-size: 12px;
-                color: #666;
-            }}
-        </style>
-    </head>
-    <body>
-        <h1>Optimized Study Routine - {current_user.name}</h1>
-        
-        <table>
-            <thead>
-                <tr>
-                    <th style="width: 16%;">Time</th>
-    """
-    
-    # Add days to the header
-    for day in days:
-        html += f'<th style="width: 14%;">{day}</th>\n'
-    
-    html += """
-                </tr>
-            </thead>
-            <tbody>
-    """
-    
-    # Add the time slots and courses
-    for hour in range(6, 12):
-        html += f'<tr>\n<td class="time-cell">{hour}:00 PM - {hour+1 if hour < 11 else 12}:00 {"PM" if hour < 11 else "AM"}</td>\n'
-        
-        for day in days:
-            if hour == dinner_hour:
-                html += '<td class="dinner-cell">Dinner Time</td>\n'
-            else:
-                slot_key = f"{day}_{hour}"
-                course_code = optimized_routine.get(slot_key, '')
-                
-                if course_code:
-                    html += f'<td><div class="course-cell">{course_code}</div></td>\n'
-                else:
-                    html += '<td></td>\n'
-                
-        html += '</tr>\n'
-    
-    html += f"""
-            </tbody>
-        </table>
-        
-        <div class="footer">
-            Generated by Schedule Planner - {current_user.department} - {theme['name']}
-        </div>
-    </body>
-    </html>
-    """
-    
-    # Convert HTML to PDF using the same code as in download_routine_pdf
-    try:
-        options = {
-            'page-size': 'A4',
-            'margin-top': '0.75in',
-            'margin-right': '0.75in',
-            'margin-bottom': '0.75in',
-            'margin-left': '0.75in',
-            'encoding': 'UTF-8',
-        }
-        
-        # Try to find wkhtmltopdf executable
-        config = None
-        if platform.system() == 'Windows':
-            # Try common locations on Windows
-            import os
-            wkhtmltopdf_paths = [
-                r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe',
-                r'C:\Program Files (x86)\wkhtmltopdf\bin\wkhtmltopdf.exe'
-            ]
-            
-            for path in wkhtmltopdf_paths:
-                if os.path.exists(path):
-                    config = pdfkit.configuration(wkhtmltopdf=path)
-                    break
-        
-        if config:
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
-                pdfkit.from_string(html, f.name, options=options, configuration=config)
-                pdf_path = f.name
-            
-            with open(pdf_path, 'rb') as f:
-                pdf_data = f.read()
-            
-            # Cleanup the temporary file
-            os.unlink(pdf_path)
-            
-            response = make_response(pdf_data)
-            response.headers['Content-Type'] = 'application/pdf'
-            response.headers['Content-Disposition'] = f'attachment; filename=optimized_routine_{current_user.student_id}.pdf'
-            return response
-        else:
-            flash('wkhtmltopdf executable not found. Please install wkhtmltopdf to enable PDF downloads.', 'warning')
-            flash('Visit https://wkhtmltopdf.org/downloads.html to download and install.', 'info')
-            return redirect(url_for('main.optimized_routine'))
-            
-    except Exception as e:
-        flash(f'Error generating PDF: {str(e)}', 'danger')
-        flash('To enable PDF downloads, please install wkhtmltopdf from https://wkhtmltopdf.org/downloads.html', 'info')
-        return redirect(url_for('main.optimized_routine'))
+    days = schedule_config.days
+    
+    return render_pdf_response('pdf/study_routine.html', f'optimized_routine_{current_user.student_id}.pdf', 'main.optimized_routine',
+                               title=f'Optimized Study Routine - {current_user.name}',
+                               theme=theme,
+                               department=current_user.department,
+                               routine=optimized_routine,
+                               days=days,
+                               dinner_hour=saved.dinner_hour)
 
 @main_bp.route('/add-event')
 @login_required
@@ -1852,6 +1524,8 @@ def save_event():
     # Save to database
     db.session.add(event)
     db.session.commit()
+    routine_cache.invalidate_user(current_user.id)
+    reminder_scheduler.schedule(event)
     
     flash(f'{event_type.capitalize()} event added successfully! Course weight updated.', 'success')
     flash(f'Remember to re-optimize your routine to reflect the updated course weights.', 'info')
@@ -1887,6 +1561,8 @@ def complete_event(event_id):
     
     # Save to database
     db.session.commit()
+    routine_cache.invalidate_user(current_user.id)
+    reminder_scheduler.cancel(event.id)
     
     # Create a notification
     notification_id = f"event_complete_{event.id}_{int(datetime.utcnow().timestamp())}"
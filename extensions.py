@@ -1,6 +1,24 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from utils.optimization_jobs import OptimizationJobQueue
+from utils.optimizer_pool import OptimizerPool
+from utils.routine_cache import RoutineCache
+from utils.batch_optimization import BatchOptimizer
+from utils.server_session import ServerSession
+from utils.pdf_renderer import PDFRenderer
+from utils.pdf_cache import PDFCache
+from utils.schedule_config import ScheduleConfig
+from utils.reminder_scheduler import ReminderScheduler
  
 db = SQLAlchemy()
 login_manager = LoginManager()
-login_manager.login_view = 'auth.login' 
\ No newline at end of file
+login_manager.login_view = 'auth.login' 
+optimization_jobs = OptimizationJobQueue()
+optimizer_pool = OptimizerPool()
+routine_cache = RoutineCache()
+batch_optimizer = BatchOptimizer()
+server_session = ServerSession()
+pdf_renderer = PDFRenderer()
+pdf_cache = PDFCache()
+schedule_config = ScheduleConfig()
+reminder_scheduler = ReminderScheduler()
\ No newline at end of file
@@ -3,4 +3,5 @@ from models.user import User
 from models.course import CourseWeight, CourseDirectory
 from models.notification import Notification
 from models.message import Message
-from models.event import Event 
\ No newline at end of file
+from models.event import Event
+from models.optimized_routine import OptimizedRoutine 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from extensions import db
 
 class EventType:
@@ -33,6 +33,9 @@ class Event(db.Model):
     """Model for tracking course events like assignments, quizzes, exams"""
     __tablename__ = 'event'
     
+    # Reminders are sent this long before the event
+    REMINDER_LEAD = timedelta(days=1)
+    
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     course_directory_id = db.Column(db.Integer, db.ForeignKey('course_directory.id'), nullable=False)
@@ -93,49 +96,57 @@ class Event(db.Model):
         
         return len(expired_events)
     
-    @classmethod
-    def check_notifications_to_send(cls):
-        """Check for notifications that need to be sent 1 day before the event"""
-        from datetime import timedelta
+    @property
+    def reminder_due_at(self):
+        """Time the reminder for this event is due"""
+        return self.event_date - self.REMINDER_LEAD
+    
+    def send_reminder(self):
+        """Create the in-app reminder and email the student, once per event"""
         from utils.email_utils import send_event_reminder_email
+        from models.notification import Notification
         
-        # Calculate the date range for events happening in the next 24 hours
-        notification_time = datetime.utcnow() + timedelta(days=1)
-        start_window = notification_time - timedelta(hours=1)
-        end_window = notification_time + timedelta(hours=1)
+        if self.email_notification_sent or self.is_completed or self.is_expired:
+            return False
         
-        # Find events in the notification window that haven't had emails sent yet
-        events_to_notify = cls.query.filter(
-            cls.event_date.between(start_window, end_window),
-            cls.email_notification_sent == False,
-            cls.is_expired == False,
-            cls.is_completed == False
-        ).all()
+        # An event that passed while the app was down is expired, not reminded
+        if self.event_date <= datetime.utcnow():
+            return False
         
-        # Create notifications and send emails
-        from models.notification import Notification
+        # Claim the reminder in one conditional UPDATE, so when two processes
+        # fire it at once only one of them goes on to notify the student
+        claimed = Event.query.filter_by(id=self.id, email_notification_sent=False).update(
+            {Event.email_notification_sent: True}, synchronize_session=False)
+        if not claimed:
+            db.session.rollback()
+            return False
         
-        notification_count = 0
-        for event in events_to_notify:
-            # Create in-app notification
-            notification_id = f"event_{event.id}_{int(datetime.utcnow().timestamp())}"
-            notification = Notification(
-                user_id=event.student_id,
-                identifier=notification_id,
-                message=f"Reminder: {event.title} ({event.event_type}) for {event.course.course_code} is due tomorrow!"
-            )
-            db.session.add(notification)
-            
-            # Send email notification
-            if event.student.email:
-                try:
-                    send_event_reminder_email(event)
-                    event.email_notification_sent = True
-                    notification_count += 1
-                except Exception as e:
-                    print(f"Error sending event reminder email: {str(e)}")
+        # Create in-app notification
+        notification_id = f"event_{self.id}_{int(datetime.utcnow().timestamp())}"
+        notification = Notification(
+            user_id=self.student_id,
+            identifier=notification_id,
+            message=f"Reminder: {self.title} ({self.event_type}) for {self.course.course_code} is due tomorrow!"
+        )
+        db.session.add(notification)
+        self.email_notification_sent = True
+        db.session.commit()
         
-        if notification_count > 0:
-            db.session.commit()
+        # Send email notification; the reminder counts as sent either way so
+        # a failed email never duplicates the in-app notification
+        if self.student.email:
+            try:
+                send_event_reminder_email(self)
+            except Exception as e:
+                print(f"Error sending event reminder email: {str(e)}")
+        
+        return True
+    
+    def expire(self):
+        """Mark the event as expired once its date has passed"""
+        if self.is_completed or self.is_expired or self.event_date > datetime.utcnow():
+            return False
         
-        return notification_count 
\ No newline at end of file
+        self.is_expired = True
+        db.session.commit()
+        return True
\ No newline at end of file
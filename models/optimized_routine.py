@@ -0,0 +1,73 @@
+import json
+import numpy as np
+from datetime import datetime
+from extensions import db
+from utils.routine_problem import RoutineProblem
+
+class OptimizedRoutine(db.Model):
+    """The latest optimized study routine of a student"""
+    __tablename__ = 'optimized_routines'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), unique=True, nullable=False)
+    algorithm = db.Column(db.String(20), nullable=False)
+    params = db.Column(db.Text, nullable=False, default='{}')  # JSON search budget and run details
+    fitness_score = db.Column(db.Float, nullable=False)
+    runtime_ms = db.Column(db.Float)
+    
+    # Routine layout and genome: one int16 course index per slot, -1 for no course
+    course_codes = db.Column(db.Text, nullable=False)  # JSON list, indexed like the genome values
+    days = db.Column(db.String(100), nullable=False)   # e.g. "Saturday,Sunday,Monday"
+    dinner_hour = db.Column(db.Integer, nullable=False)
+    genome = db.Column(db.LargeBinary, nullable=False)
+    layout_fingerprint = db.Column(db.String(64), nullable=False)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @classmethod
+    def save_for_user(cls, user_id, problem, routine, fitness_score, algorithm, params=None, metadata=None):
+        """
+        Store a student's optimized routine, replacing the previous one
+        
+        Args:
+            user_id: ID of the student
+            problem: RoutineProblem the routine was optimized for
+            routine: Dictionary mapping slot keys to course codes
+            fitness_score: Fitness of the routine
+            algorithm: Name of the optimization algorithm
+            params: Dictionary with the search budget
+            metadata: Optimizer metadata of the run
+            
+        Returns:
+            The OptimizedRoutine
+        """
+        metadata = metadata or {}
+        saved = cls.query.filter_by(user_id=user_id).first()
+        if saved is None:
+            saved = cls(user_id=user_id)
+            db.session.add(saved)
+        
+        saved.algorithm = algorithm
+        saved.params = json.dumps({**(params or {}), **metadata}, default=str)
+        saved.fitness_score = float(fitness_score)
+        saved.runtime_ms = metadata.get('elapsed_ms')
+        saved.course_codes = json.dumps(list(problem.course_codes))
+        saved.days = ','.join(problem.days)
+        saved.dinner_hour = problem.dinner_hour
+        saved.genome = problem.encode(routine).astype(np.int16).tobytes()
+        saved.layout_fingerprint = problem.layout_fingerprint()
+        
+        db.session.commit()
+        return saved
+    
+    @property
+    def routine(self):
+        """Dictionary mapping slot keys to course codes"""
+        course_codes = json.loads(self.course_codes)
+        layout = RoutineProblem(course_codes, [0] * len(course_codes),
+                                dinner_hour=self.dinner_hour, days=self.days.split(','))
+        return layout.decode(np.frombuffer(self.genome, dtype=np.int16).tolist())
+    
+    def __repr__(self):
+        return f"OptimizedRoutine(user_id={self.user_id}, algorithm='{self.algorithm}', fitness={self.fitness_score})"
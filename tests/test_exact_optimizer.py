@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from utils.exact_optimizer import ExactOptimizer
+from utils.fitness import FitnessEngine
+from utils.routine_problem import DEFAULT_DAYS, RoutineProblem
+
+
+def random_problem(rng):
+    num_courses = int(rng.integers(0, 45))
+    # Some zero and negative weights, which the optimum leaves out
+    weights = rng.choice([rng.uniform(0.5, 12), 0.0, -1.0], size=num_courses, p=[0.8, 0.1, 0.1])
+    days = rng.choice(DEFAULT_DAYS, size=int(rng.integers(1, len(DEFAULT_DAYS) + 1)), replace=False)
+    return RoutineProblem([f"C{idx}" for idx in range(num_courses)], weights.round(2),
+                          dinner_hour=int(rng.integers(5, 13)), days=list(days))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_reaches_upper_bound(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(25):
+        problem = random_problem(rng)
+        optimizer = ExactOptimizer(problem)
+
+        _, fitness_score = optimizer.optimize()
+
+        assert fitness_score == pytest.approx(optimizer.metadata['upper_bound'])
+        assert optimizer.metadata['optimal']
+
+
+def test_upper_bound_is_not_exceeded_by_random_routines():
+    rng = np.random.default_rng(0)
+    problem = RoutineProblem(['C0', 'C1', 'C2'], [4.0, 2.5, 1.0], dinner_hour=8, days=['Sunday', 'Monday'])
+    optimizer = ExactOptimizer(problem)
+    optimizer.optimize()
+
+    engine = FitnessEngine(problem.weights, problem.day_starts)
+    genomes = rng.integers(-1, problem.num_courses, size=(5000, problem.num_slots))
+
+    assert engine.evaluate_population(genomes).max() <= optimizer.metadata['upper_bound'] + 1e-9
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from utils.fitness import FitnessEngine
+from utils.routine_problem import STUDY_HOURS, RoutineProblem
+
+
+def reference_fitness(problem, genome):
+    """The per-slot fitness loop the optimizers used before FitnessEngine."""
+    routine = {}
+    for i, course_idx in enumerate(genome):
+        if 0 <= course_idx < problem.num_courses:
+            routine[i] = problem.course_codes[course_idx]
+
+    weights = dict(zip(problem.course_codes, problem.weights))
+    total_weight = sum(weights[course] for course in set(routine.values()))
+
+    penalty = 0
+    slots_per_day = len([hour for hour in STUDY_HOURS if hour != problem.dinner_hour])
+    for day in range(len(problem.days)):
+        consecutive_count = 1
+        prev_course = None
+        for slot in range(day * slots_per_day, (day + 1) * slots_per_day):
+            current_course = routine.get(slot)
+            if current_course and current_course == prev_course:
+                consecutive_count += 1
+            else:
+                if consecutive_count > 1:
+                    penalty += {2: 4, 3: 6, 4: 8}.get(consecutive_count, 10)
+                consecutive_count = 1
+            prev_course = current_course
+        if consecutive_count > 1:
+            penalty += {2: 4, 3: 6, 4: 8}.get(consecutive_count, 10)
+
+    return total_weight - penalty
+
+
+def random_genomes(rng, problem, count):
+    """Genomes built from runs of 1 to 6 equal genes, with gaps and out-of-range values."""
+    genomes = np.empty((count, problem.num_slots), dtype=np.int64)
+    for genome in genomes:
+        pos = 0
+        while pos < len(genome):
+            length = int(rng.integers(1, 7))
+            genome[pos:pos + length] = rng.integers(-1, problem.num_courses + 1)
+            pos += length
+    return genomes
+
+
+@pytest.mark.parametrize('dinner_hour', [5, 6, 8, 11, 12])
+@pytest.mark.parametrize('num_courses', [1, 2, 4, 9])
+def test_evaluate_population_matches_reference_loop(dinner_hour, num_courses):
+    rng = np.random.default_rng(dinner_hour * 100 + num_courses)
+    problem = RoutineProblem([f"C{idx}" for idx in range(num_courses)],
+                             rng.uniform(0.5, 12, num_courses).round(2), dinner_hour=dinner_hour)
+    engine = FitnessEngine(problem.weights, problem.day_starts)
+    genomes = random_genomes(rng, problem, 500)
+
+    expected = [reference_fitness(problem, genome) for genome in genomes]
+
+    assert engine.evaluate_population(genomes) == pytest.approx(expected)
+
+
+def test_run_penalties_by_length():
+    # Dinner outside the study hours leaves 6 slots per day
+    problem = RoutineProblem(['C0', 'C1'], [10.0, 1.0], dinner_hour=12, days=['Sunday'])
+    engine = FitnessEngine(problem.weights, problem.day_starts)
+
+    runs = {1: 0, 2: 4, 3: 6, 4: 8, 5: 10, 6: 10}
+    for length, penalty in runs.items():
+        genome = [0] * length + [-1] * (6 - length)
+        assert engine.evaluate(genome) == pytest.approx(10.0 - penalty), length
+
+
+def test_runs_do_not_continue_into_the_next_day():
+    problem = RoutineProblem(['C0'], [5.0], dinner_hour=8, days=['Sunday', 'Monday'])
+    engine = FitnessEngine(problem.weights, problem.day_starts)
+
+    # Last slot of Sunday and first slot of Monday hold the same course
+    genome = [-1, -1, -1, -1, 0, 0, -1, -1, -1, -1]
+
+    assert engine.evaluate(genome) == pytest.approx(5.0)
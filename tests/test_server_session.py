@@ -0,0 +1,108 @@
+import pytest
+from flask import Flask, session
+from flask_login import LoginManager, UserMixin, login_user, logout_user
+from utils.server_session import ServerSession
+
+
+class User(UserMixin):
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+@pytest.fixture(params=['filesystem', 'sqlite'])
+def app(request, tmp_path):
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SECRET_KEY='test',
+        SESSION_BACKEND=request.param,
+        SESSION_FILE_DIR=str(tmp_path / 'sessions'),
+        SESSION_SQLITE_PATH=str(tmp_path / 'sessions.db')
+    )
+    ServerSession(app)
+
+    login_manager = LoginManager(app)
+    login_manager.user_loader(User)
+
+    @app.route('/theme/<name>')
+    def set_theme(name):
+        session['user_theme'] = name
+        return ''
+
+    @app.route('/login')
+    def login():
+        login_user(User('1'))
+        return ''
+
+    @app.route('/logout')
+    def logout():
+        logout_user()
+        return ''
+
+    @app.route('/whoami')
+    def whoami():
+        return {'user_id': session.get('_user_id'), 'theme': session.get('user_theme')}
+
+    return app
+
+
+def session_id(client, app):
+    cookie = client.get_cookie(app.config['SESSION_COOKIE_NAME'])
+    return cookie.value if cookie else None
+
+
+def stored(app, sid):
+    interface = app.extensions['server_session'].interface
+    return interface.store.load(sid, app.permanent_session_lifetime.total_seconds()) is not None
+
+
+def test_login_issues_new_session_id(app):
+    client = app.test_client()
+    client.get('/theme/green')
+    anonymous_sid = session_id(client, app)
+
+    client.get('/login')
+    sid = session_id(client, app)
+
+    assert sid != anonymous_sid
+    assert not stored(app, anonymous_sid)
+    assert stored(app, sid)
+    assert client.get('/whoami').json == {'user_id': '1', 'theme': 'green'}
+
+
+def test_planted_session_id_is_not_logged_in(app):
+    attacker = app.test_client()
+    attacker.get('/theme/green')
+    planted_sid = session_id(attacker, app)
+
+    victim = app.test_client()
+    victim.set_cookie(app.config['SESSION_COOKIE_NAME'], planted_sid)
+    victim.get('/login')
+
+    assert session_id(victim, app) != planted_sid
+    assert attacker.get('/whoami').json['user_id'] is None
+
+
+def test_logout_issues_new_session_id(app):
+    client = app.test_client()
+    client.get('/theme/green')
+    client.get('/login')
+    logged_in_sid = session_id(client, app)
+
+    client.get('/logout')
+    sid = session_id(client, app)
+
+    assert sid != logged_in_sid
+    assert not stored(app, logged_in_sid)
+    assert client.get('/whoami').json == {'user_id': None, 'theme': 'green'}
+
+
+def test_logout_of_empty_session_clears_cookie(app):
+    client = app.test_client()
+    client.get('/login')
+    logged_in_sid = session_id(client, app)
+
+    client.get('/logout')
+
+    assert not stored(app, logged_in_sid)
+    assert session_id(client, app) is None
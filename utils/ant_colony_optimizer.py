@@ -1,5 +1,7 @@
-import random
+import secrets
+import time
 import numpy as np
+from utils.fitness import FitnessEngine, FitnessCache
 
 class AntColonyOptimizer:
     """
@@ -8,31 +10,36 @@ class AntColonyOptimizer:
     based on course weights and study constraints.
     """
     
-    def __init__(self, courses, dinner_hour=8, days=None):
+    # Pheromone deposit strategies
+    DEPOSIT_PROPORTIONAL = 'proportional'
+    DEPOSIT_ELITIST = 'elitist'
+    DEPOSIT_RANK = 'rank'
+    
+    def __init__(self, problem, deposit_strategy=DEPOSIT_PROPORTIONAL, seed=None):
         """
-        Initialize the ACO optimizer with courses and constraints.
+        Initialize the ACO optimizer with a routine problem snapshot.
         
         Args:
-            courses: List of course objects with course_code and current_weight attributes
-            dinner_hour: Hour reserved for dinner (6-11, representing 6 PM to 11 PM)
-            days: List of days to optimize for (defaults to all days of the week)
+            problem: RoutineProblem holding the course codes, weights, days and dinner hour
+            deposit_strategy: Pheromone deposit strategy ('proportional', 'elitist' or 'rank')
+            seed: Optional seed of the optimizer's random generator; a random
+                seed is drawn (and reported in metadata) when omitted
         """
-        self.courses = courses
-        self.course_codes = [course.course_code for course in courses]
-        self.course_weights = {course.course_code: course.current_weight for course in courses}
-        self.dinner_hour = dinner_hour
-        self.days = days or ["Saturday", "Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
-        
-        # Each slot is identified by day_hour
-        self.slots = []
-        for day in self.days:
-            for hour in range(6, 12):  # 6 PM to 11 PM
-                if hour != dinner_hour:  # Skip dinner hour
-                    self.slots.append(f"{day}_{hour}")
+        self.problem = problem
+        
+        # Every run draws from its own generator, never the global NumPy state
+        self.seed = seed if seed is not None else secrets.randbits(32)
+        self.rng = np.random.default_rng(self.seed)
+        self.course_codes = problem.course_codes
+        self.dinner_hour = problem.dinner_hour
+        self.days = problem.days
         
         # Number of slots available
-        self.num_slots = len(self.slots)
-        self.num_courses = len(self.courses)
+        self.num_slots = problem.num_slots
+        self.num_courses = problem.num_courses
+        
+        # Fitness engine built once from the snapshot's weight vector
+        self.fitness_engine = FitnessEngine(problem.weights, problem.day_starts)
         
         # Initialize pheromone matrix
         # Shape: num_slots x (num_courses + 1), where +1 is for "no course" option
@@ -44,6 +51,20 @@ class AntColonyOptimizer:
         self.alpha = 1.0  # pheromone influence
         self.beta = 2.0   # heuristic influence
         self.q0 = 0.9     # exploitation vs exploration
+        
+        # Pheromone deposit parameters
+        self.deposit_strategy = deposit_strategy
+        self.elitist_weight = 2.0  # extra deposit of the best-so-far solution
+        self.rank_size = 6         # ants ranked for the rank-based deposit
+        
+        # Extra pheromone laid on the previous routine when warm-starting
+        self.warm_start_deposit = 2.0
+        
+        # Maximum number of distinct solutions remembered by the fitness cache
+        self.fitness_cache_size = 10000
+        
+        # Details of the last optimize() run
+        self.metadata = {}
     
     def _heuristic_information(self):
         """
@@ -52,213 +73,234 @@ class AntColonyOptimizer:
         Returns:
             Numpy array of shape (num_slots, num_courses + 1)
         """
-        # Initialize with small values
-        heuristic = np.ones((self.num_slots, self.num_courses + 1)) * 0.1
+        # Initialize with small values (the "no course" option keeps a low preference)
+        heuristic = np.full((self.num_slots, self.num_courses + 1), 0.1)
         
-        # For each course, set the heuristic based on course weight
-        for c_idx, course_code in enumerate(self.course_codes):
-            weight = self.course_weights[course_code]
-            
-            # Higher weight = higher heuristic value
-            for s_idx in range(self.num_slots):
-                heuristic[s_idx, c_idx] = weight
-                
-            # No course option has lower preference
-            heuristic[:, -1] = 0.1
+        # Higher weight = higher heuristic value
+        heuristic[:, :-1] = self.problem.weights
         
         return heuristic
     
-    def _evaluate_solution(self, solution):
+    def _evaluate_solutions(self, solutions):
         """
-        Evaluate a solution's fitness.
+        Evaluate the fitness of all ant solutions in one batch.
+        
+        Solutions already scored in this run are served from the fitness cache.
         
         Args:
-            solution: List of course indices for each slot (-1 for no course)
+            solutions: List of solutions (each is a list of course indices, -1 for no course)
             
         Returns:
-            Fitness score (higher is better)
+            Numpy array with the fitness score of each solution (higher is better)
         """
-        # Get the latest course weights directly from the course objects
-        course_weights = {course.course_code: course.current_weight for course in self.courses}
-        
-        # Convert solution indices to course codes
-        routine = {}
-        for i, course_idx in enumerate(solution):
-            # Skip "no course" option (-1)
-            if course_idx >= 0 and course_idx < self.num_courses:
-                routine[self.slots[i]] = self.course_codes[course_idx]
-        
-        # Calculate total weight of included courses (without duplicates)
-        included_courses = set(routine.values())
-        total_weight = sum(course_weights.get(course, 0) for course in included_courses)
-        
-        # Apply penalties for consecutive same-course slots
-        penalty = 0
-        
-        # Check consecutive slots per day
-        for day in self.days:
-            day_slots = [h for h in range(6, 12) if h != self.dinner_hour]
-            day_slots.sort()  # Ensure slots are in order
-            
-            # Check for consecutive slots with the same course
-            consecutive_count = 1
-            prev_course = None
-            
-            for hour in day_slots:
-                slot_key = f"{day}_{hour}"
-                current_course = routine.get(slot_key)
-                
-                if current_course and current_course == prev_course:
-                    consecutive_count += 1
-                else:
-                    # Apply penalty for the previous sequence if needed
-                    if consecutive_count > 1:
-                        if consecutive_count == 2:
-                            penalty += 4
-                        elif consecutive_count == 3:
-                            penalty += 6
-                        elif consecutive_count == 4:
-                            penalty += 8
-                        elif consecutive_count >= 5:
-                            penalty += 10
-                    consecutive_count = 1
-                
-                prev_course = current_course
-            
-            # Check final sequence
-            if consecutive_count > 1:
-                if consecutive_count == 2:
-                    penalty += 4
-                elif consecutive_count == 3:
-                    penalty += 6
-                elif consecutive_count == 4:
-                    penalty += 8
-                elif consecutive_count >= 5:
-                    penalty += 10
-        
-        # Final fitness score (weight - penalties)
-        fitness = total_weight - penalty
-        
-        return fitness, routine
+        return self.fitness_cache.evaluate_population(solutions, self.fitness_engine.evaluate_population)
     
-    def _ant_tour(self, heuristic):
+    def _construct_solutions(self, heuristic):
         """
-        Generate a single ant's tour (solution).
+        Build the tours (solutions) of all ants in one iteration at once.
+        
+        The probability matrix is computed once per iteration. Each ant then
+        either exploits the most attractive course for a slot (with
+        probability q0) or explores by sampling from the slot's distribution
+        through a cumulative-sum search over the whole (ants x slots) array.
         
         Args:
             heuristic: Heuristic information matrix
             
         Returns:
-            List of course indices for each slot
+            Numpy array of shape (num_ants, num_slots) with course indices (-1 for no course)
         """
-        solution = [-1] * self.num_slots  # Initialize with "no course" option
+        num_options = self.num_courses + 1
         
-        # For each slot, select a course
-        for slot_idx in range(self.num_slots):
-            # Calculate probabilities for each course
-            pheromone = self.pheromones[slot_idx, :]
-            eta = heuristic[slot_idx, :]
-            
-            # Probability calculation: tau^alpha * eta^beta
-            probabilities = (pheromone ** self.alpha) * (eta ** self.beta)
-            probabilities = probabilities / np.sum(probabilities)
-            
-            # Exploitation vs exploration
-            if random.random() < self.q0:
-                # Exploitation: choose best course
-                course_idx = np.argmax(probabilities)
-            else:
-                # Exploration: choose based on probability
-                course_idx = random.choices(
-                    range(self.num_courses + 1),
-                    weights=probabilities,
-                    k=1
-                )[0]
-            
-            # Adjust to use -1 for the "no course" option
-            if course_idx == self.num_courses:
-                solution[slot_idx] = -1
-            else:
-                solution[slot_idx] = course_idx
+        # Probability calculation: tau^alpha * eta^beta, normalized per slot
+        attractiveness = (self.pheromones ** self.alpha) * (heuristic ** self.beta)
+        probabilities = attractiveness / attractiveness.sum(axis=1, keepdims=True)
+        
+        # Exploitation: the best course for every slot
+        best_courses = np.argmax(probabilities, axis=1)
+        
+        # Exploration: shift each slot's cumulative distribution by its slot
+        # index so one searchsorted call samples every (ant, slot) pair
+        slot_offsets = np.arange(self.num_slots)
+        cumulative = (np.cumsum(probabilities, axis=1) + slot_offsets[:, np.newaxis]).ravel()
+        draws = self.rng.random((self.num_ants, self.num_slots)) + slot_offsets
+        sampled = np.searchsorted(cumulative, draws, side='right') - slot_offsets * num_options
+        sampled = np.clip(sampled, 0, self.num_courses)
         
-        return solution
+        # Exploitation vs exploration
+        exploit = self.rng.random((self.num_ants, self.num_slots)) < self.q0
+        choices = np.where(exploit, best_courses, sampled)
+        
+        # Adjust to use -1 for the "no course" option
+        return np.where(choices == self.num_courses, -1, choices)
     
-    def _update_pheromones(self, solutions, fitnesses):
+    def _update_pheromones(self, solutions, fitnesses, best_solution=None):
         """
         Update pheromone trails based on ant solutions.
         
+        Supported deposit strategies:
+        - proportional: every ant deposits its normalized fitness
+        - elitist: as proportional, plus the best-so-far solution deposits
+          ``elitist_weight`` extra
+        - rank: only the ``rank_size - 1`` best ants deposit, weighted by rank,
+          plus the best-so-far solution with weight ``rank_size``
+        
         Args:
-            solutions: List of solutions (each is a list of course indices)
-            fitnesses: List of fitness scores for each solution
+            solutions: Array of shape (num_ants, num_slots) with course indices
+            fitnesses: Array with the fitness score of each solution
+            best_solution: Best solution found so far, used by the elitist and rank strategies
         """
+        solutions = np.asarray(solutions)
+        fitnesses = np.asarray(fitnesses, dtype=float)
+        
         # Evaporate all pheromones
         self.pheromones *= (1 - self.evaporation_rate)
         
-        # Deposit new pheromones based on solution quality
-        for solution, fitness in zip(solutions, fitnesses):
-            # Normalize fitness (higher fitness = more pheromones)
-            normalized_fitness = fitness / max(fitnesses) if max(fitnesses) > 0 else fitness
+        # Normalize fitness once (higher fitness = more pheromones)
+        max_fitness = fitnesses.max()
+        normalized = fitnesses / max_fitness if max_fitness > 0 else fitnesses
+        
+        if self.deposit_strategy == self.DEPOSIT_RANK:
+            # Only the best ants deposit, the best one with the largest weight
+            ranked = np.argsort(-normalized)[:self.rank_size - 1]
+            deposits = normalized[ranked] * (self.rank_size - np.arange(1, len(ranked) + 1))
+            solutions = solutions[ranked]
+        else:
+            deposits = normalized
+        
+        if best_solution is not None:
+            if self.deposit_strategy == self.DEPOSIT_ELITIST:
+                elite_weight = self.elitist_weight
+            elif self.deposit_strategy == self.DEPOSIT_RANK:
+                elite_weight = self.rank_size
+            else:
+                elite_weight = 0
             
-            # Update pheromones for each slot-course combination in this solution
-            for slot_idx, course_idx in enumerate(solution):
-                # Adjust course_idx for the "no course" option
-                pheromone_idx = course_idx if course_idx >= 0 else self.num_courses
-                
-                # Deposit pheromones proportional to solution quality
-                self.pheromones[slot_idx, pheromone_idx] += normalized_fitness
+            if elite_weight:
+                solutions = np.vstack([solutions, np.asarray(best_solution)])
+                deposits = np.append(deposits, elite_weight)
+        
+        # Scatter-add every (slot, course) deposit in one pass, mapping the
+        # "no course" option (-1) to the last pheromone column
+        num_options = self.num_courses + 1
+        columns = np.where(solutions >= 0, solutions, self.num_courses)
+        cells = (np.arange(self.num_slots) * num_options + columns).ravel()
+        amounts = np.repeat(deposits, self.num_slots)
+        self.pheromones += np.bincount(cells, weights=amounts,
+                                       minlength=self.num_slots * num_options).reshape(self.pheromones.shape)
         
         # Ensure pheromones don't get too small
         self.pheromones = np.maximum(self.pheromones, 0.1)
     
-    def optimize(self, iterations=30):
+    def _bias_pheromones(self, solution):
+        """
+        Lay extra pheromone on a previous routine so the ants start near it.
+        
+        Args:
+            solution: Sequence of course indices for each slot (-1 for no course)
+        """
+        solution = np.asarray(solution)
+        columns = np.where(solution >= 0, solution, self.num_courses)
+        self.pheromones[np.arange(self.num_slots), columns] += self.warm_start_deposit
+    
+    def optimize(self, iterations=30, time_budget_ms=None, patience=None, initial_solution=None):
         """
         Run the ACO algorithm.
         
+        The run stops early, returning the best routine found so far, when
+        the time budget is used up or when the best fitness has not improved
+        for ``patience`` iterations. ``metadata['iterations_run']`` reports
+        how many iterations actually ran.
+        
+        Passing the genome of a previous routine (see RoutineProblem.encode)
+        warm-starts the search: the pheromones start biased toward it and it
+        is the initial best-so-far solution.
+        
+        Runs with the same seed, problem and arguments return the same
+        routine, unless they are cut short by the time budget.
+        
         Args:
-            iterations: Number of iterations (generations) to run
+            iterations: Maximum number of iterations (generations) to run
+            time_budget_ms: Optional wall-clock budget in milliseconds
+            patience: Optional number of iterations without improvement before stopping
+            initial_solution: Optional genome of a previous routine for the same layout
             
         Returns:
             Tuple containing:
             - Dictionary mapping slot keys to course codes for the optimized routine
             - Final fitness score
         """
-        # Update course weights before optimization
-        self.course_weights = {course.course_code: course.current_weight for course in self.courses}
+        start_time = time.perf_counter()
+        deadline = start_time + time_budget_ms / 1000 if time_budget_ms else None
+        
+        # Restart the generator and the trails so every run with this seed is reproducible
+        self.rng = np.random.default_rng(self.seed)
+        self.pheromones = np.ones((self.num_slots, self.num_courses + 1))
         
         # Calculate heuristic information
         heuristic = self._heuristic_information()
+        self.fitness_cache = FitnessCache(self.fitness_cache_size)
         
         # Keep track of the best solution
         best_solution = None
         best_fitness = -float('inf')
-        best_routine = {}
+        
+        # Warm start from the previous routine
+        if initial_solution is not None:
+            self._bias_pheromones(initial_solution)
+            best_solution = [int(course) for course in initial_solution]
+            best_fitness = float(self._evaluate_solutions([best_solution])[0])
         
         # Run for specified number of iterations
-        for _ in range(iterations):
-            # Generate solutions with multiple ants
-            solutions = []
-            for _ in range(self.num_ants):
-                ant_solution = self._ant_tour(heuristic)
-                solutions.append(ant_solution)
+        iterations_run = 0
+        stale_iterations = 0
+        stop_reason = None
+        for iteration in range(iterations):
+            # Always finish one iteration so there is a best-so-far routine
+            if iteration > 0 and deadline is not None and time.perf_counter() >= deadline:
+                stop_reason = 'time_budget'
+                break
+            
+            # Generate solutions with all ants at once
+            solutions = self._construct_solutions(heuristic)
             
             # Evaluate all solutions
-            evaluation_results = [self._evaluate_solution(solution) for solution in solutions]
-            fitnesses = [result[0] for result in evaluation_results]
-            routines = [result[1] for result in evaluation_results]
+            fitnesses = self._evaluate_solutions(solutions)
             
             # Find the best solution in this iteration
-            best_idx = np.argmax(fitnesses)
-            iteration_best_fitness = fitnesses[best_idx]
-            iteration_best_solution = solutions[best_idx]
-            iteration_best_routine = routines[best_idx]
+            best_idx = int(np.argmax(fitnesses))
+            iteration_best_fitness = float(fitnesses[best_idx])
+            iteration_best_solution = solutions[best_idx].tolist()
             
             # Update global best if needed
             if iteration_best_fitness > best_fitness:
                 best_fitness = iteration_best_fitness
                 best_solution = iteration_best_solution
-                best_routine = iteration_best_routine
+                stale_iterations = 0
+            else:
+                stale_iterations += 1
             
             # Update pheromones
-            self._update_pheromones(solutions, fitnesses)
+            self._update_pheromones(solutions, fitnesses, best_solution)
+            iterations_run = iteration + 1
+            
+            # Stop once the best fitness has converged
+            if patience and stale_iterations >= patience:
+                stop_reason = 'converged'
+                break
+        
+        # Convert to a usable routine
+        best_routine = self.problem.decode(best_solution) if best_solution is not None else {}
+        
+        self.metadata = {
+            'algorithm': 'ant_colony',
+            'seed': self.seed,
+            'iterations_run': iterations_run,
+            'stop_reason': stop_reason,
+            'warm_start': initial_solution is not None,
+            'elapsed_ms': (time.perf_counter() - start_time) * 1000,
+            'evaluations': self.fitness_cache.misses,
+            **self.fitness_cache.stats()
+        }
         
         return best_routine, best_fitness 
\ No newline at end of file
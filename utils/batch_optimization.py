@@ -0,0 +1,184 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.optimization_jobs import JobStatus
+from utils.optimizers import optimize_routine
+
+
+def _optimize_chunk(algorithm, params, options, problems):
+    """
+    Optimize a chunk of students' routines inside a worker process.
+
+    Returns:
+        List with a (routine, fitness_score, metadata) tuple per problem, or
+        an error message string where the optimization failed
+    """
+    results = []
+    for problem in problems:
+        try:
+            results.append(optimize_routine(algorithm, problem, params, options))
+        except Exception as e:
+            results.append(str(e))
+    return results
+
+
+class BatchOptimization:
+    """Re-optimization of many students' routines, e.g. after an admin weight change."""
+
+    def __init__(self, description, total, algorithms):
+        self.id = uuid.uuid4().hex
+        self.description = description
+        self.algorithms = sorted(set(algorithms))
+        self.status = JobStatus.PENDING
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def is_finished(self):
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def to_dict(self):
+        """Serialize the batch for the progress endpoint."""
+        data = {
+            'id': self.id,
+            'description': self.description,
+            'status': self.status,
+            'algorithms': self.algorithms,
+            'total': self.total,
+            'completed': self.completed,
+            'failed': self.failed,
+            'progress': (self.completed + self.failed) / self.total if self.total else 1.0,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if self.status == JobStatus.FAILED:
+            data['error'] = self.error
+        return data
+
+
+class BatchOptimizer:
+    """
+    Runs batch re-optimizations in the background.
+
+    Each batch is driven by one background thread that sends the students'
+    problem snapshots in chunks to the OptimizerPool worker processes (or
+    runs them in that thread when the pool is off) and hands every result
+    to a callback as it arrives, so progress can be followed while the
+    batch runs. Every student keeps their own algorithm; a chunk only holds
+    students of one algorithm.
+    """
+
+    def __init__(self, app=None):
+        self._app = None
+        self._executor = None
+        self._batches = {}
+        self._lock = threading.Lock()
+        self.pool = None
+        self.chunk_size = 25
+        self.result_ttl = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, pool=None):
+        """Create the batch driver from the app configuration."""
+        self._app = app
+        self.pool = pool
+        self.chunk_size = app.config.setdefault('BATCH_OPTIMIZATION_CHUNK_SIZE', 25)
+        self.result_ttl = app.config.setdefault('OPTIMIZATION_JOB_TTL', 3600)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='batch-optimizer')
+        app.extensions['batch_optimizer'] = self
+
+    def submit(self, description, problems, algorithms, settings, on_result=None):
+        """
+        Queue the re-optimization of many routines.
+
+        Args:
+            description: Short text shown with the progress
+            problems: Dictionary mapping user IDs to RoutineProblem snapshots
+            algorithms: Dictionary mapping the same user IDs to algorithm names
+            settings: Dictionary mapping every algorithm used to a (params, options)
+                tuple with the keyword arguments of optimize() and of
+                create_optimizer() (without pool)
+            on_result: Optional callable (user_id, problem, routine, fitness_score, metadata)
+                called in the app context for every optimized routine
+
+        Returns:
+            The BatchOptimization
+        """
+        batch = BatchOptimization(description, len(problems), algorithms.values())
+        with self._lock:
+            self._prune()
+            self._batches[batch.id] = batch
+
+        self._executor.submit(self._run_batch, batch, dict(problems), dict(algorithms), settings, on_result)
+        return batch
+
+    def get(self, batch_id):
+        """Return the batch with the given ID, or None if it is unknown or pruned."""
+        with self._lock:
+            return self._batches.get(batch_id)
+
+    def _run_batch(self, batch, problems, algorithms, settings, on_result):
+        batch.status = JobStatus.RUNNING
+        batch.started_at = time.time()
+        try:
+            with self._app.app_context():
+                users_by_algorithm = {}
+                for user_id in problems:
+                    users_by_algorithm.setdefault(algorithms[user_id], []).append(user_id)
+
+                chunks = []
+                tasks = []
+                for algorithm, user_ids in users_by_algorithm.items():
+                    params, options = settings[algorithm]
+                    for start in range(0, len(user_ids), self.chunk_size):
+                        chunk = user_ids[start:start + self.chunk_size]
+                        chunks.append(chunk)
+                        tasks.append((algorithm, params, options, [problems[user_id] for user_id in chunk]))
+
+                if self.pool is not None and self.pool.enabled:
+                    # Chunks run on the worker processes, results arrive as they finish
+                    futures = {self.pool.submit(_optimize_chunk, *task): chunk
+                               for chunk, task in zip(chunks, tasks)}
+                    results = ((futures[future], future.result()) for future in as_completed(futures))
+                else:
+                    results = ((chunk, _optimize_chunk(*task)) for chunk, task in zip(chunks, tasks))
+
+                for chunk, chunk_results in results:
+                    for user_id, result in zip(chunk, chunk_results):
+                        if isinstance(result, str):
+                            batch.failed += 1
+                            print(f"Error re-optimizing routine of user {user_id}: {result}")
+                            continue
+                        if on_result is not None:
+                            on_result(user_id, problems[user_id], *result)
+                        batch.completed += 1
+            # finished_at is set before the status so _prune never sees a
+            # finished batch without it
+            batch.finished_at = time.time()
+            batch.status = JobStatus.COMPLETED
+        except Exception as e:
+            batch.error = str(e)
+            batch.finished_at = time.time()
+            batch.status = JobStatus.FAILED
+            print(f"Error in batch optimization {batch.id}: {str(e)}")
+
+    def _prune(self):
+        """Drop finished batches older than the result TTL. Caller holds the lock."""
+        cutoff = time.time() - self.result_ttl
+        expired = [batch_id for batch_id, batch in self._batches.items()
+                   if batch.is_finished and batch.finished_at < cutoff]
+        for batch_id in expired:
+            del self._batches[batch_id]
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
@@ -0,0 +1,149 @@
+import time
+import numpy as np
+from utils.fitness import FitnessEngine
+
+class ExactOptimizer:
+    """
+    A deterministic exact optimizer for study routines.
+    
+    The fitness counts every included course's weight once and only
+    subtracts penalties for same-course runs, so the optimum is known in
+    closed form: include the best positive-weight courses (at most one per
+    slot) and never place the same course in two adjacent slots of a day.
+    The optimizer builds such a routine directly, filling the remaining
+    slots in proportion to the course weights, and checks the result
+    against that upper bound.
+    """
+    
+    def __init__(self, problem):
+        """
+        Initialize the exact optimizer with a routine problem snapshot.
+        
+        Args:
+            problem: RoutineProblem holding the course codes, weights, days and dinner hour
+        """
+        self.problem = problem
+        self.course_codes = problem.course_codes
+        self.dinner_hour = problem.dinner_hour
+        self.days = problem.days
+        
+        # Number of slots available
+        self.num_slots = problem.num_slots
+        self.num_courses = problem.num_courses
+        
+        # Fitness engine built once from the snapshot's weight vector
+        self.fitness_engine = FitnessEngine(problem.weights, problem.day_starts)
+        
+        # Details of the last optimize() run
+        self.metadata = {}
+    
+    def _select_courses(self):
+        """
+        Pick the courses of the optimal routine.
+        
+        Returns:
+            List of course indices with a positive weight, heaviest first,
+            limited to one course per slot
+        """
+        weights = self.problem.weights
+        # Stable sort keeps the course order for equal weights (deterministic)
+        ranked = np.argsort(-weights, kind='stable')
+        return [int(idx) for idx in ranked if weights[idx] > 0][:self.num_slots]
+    
+    def _slot_counts(self, courses):
+        """
+        Share the slots among the selected courses in proportion to their weights.
+        
+        Every course gets at least one slot; the rest are handed out by the
+        largest-remainder method.
+        
+        Args:
+            courses: Selected course indices
+            
+        Returns:
+            Numpy array with the number of slots of each selected course
+        """
+        weights = self.problem.weights[courses]
+        counts = np.ones(len(courses), dtype=np.int64)
+        spare = self.num_slots - len(courses)
+        
+        shares = weights / weights.sum() * spare
+        counts += np.floor(shares).astype(np.int64)
+        remainders = shares - np.floor(shares)
+        leftover = self.num_slots - counts.sum()
+        counts[np.argsort(-remainders, kind='stable')[:leftover]] += 1
+        return counts
+    
+    def _arrange(self, courses, counts):
+        """
+        Place the courses in the slots without same-course runs within a day.
+        
+        Each slot takes the course with the most slots left that differs from
+        the previous slot of the same day. A slot stays empty only when the
+        sole remaining course would repeat, so every selected course is placed.
+        
+        Args:
+            courses: Selected course indices
+            counts: Number of slots of each selected course
+            
+        Returns:
+            Numpy array with the course index of each slot (-1 for no course)
+        """
+        genome = np.full(self.num_slots, -1, dtype=np.int64)
+        remaining = counts.copy()
+        previous = -1
+        
+        for slot_idx in range(self.num_slots):
+            # Runs only count inside a day
+            if self.problem.day_starts[slot_idx]:
+                previous = -1
+            
+            # Highest remaining count first, ties broken by weight order
+            candidates = [pos for pos in np.argsort(-remaining, kind='stable')
+                          if remaining[pos] > 0 and courses[pos] != previous]
+            if not candidates:
+                previous = -1
+                continue
+            
+            pos = candidates[0]
+            genome[slot_idx] = courses[pos]
+            remaining[pos] -= 1
+            previous = courses[pos]
+        
+        return genome
+    
+    def optimize(self, initial_solution=None):
+        """
+        Build the optimal routine.
+        
+        Args:
+            initial_solution: Accepted for compatibility with the other
+                optimizers; the exact solver does not need a warm start
+            
+        Returns:
+            Tuple containing:
+            - Dictionary mapping slot keys to course codes for the optimized routine
+            - Final fitness score
+        """
+        start_time = time.perf_counter()
+        
+        courses = self._select_courses()
+        if courses:
+            genome = self._arrange(courses, self._slot_counts(courses))
+        else:
+            genome = np.full(self.num_slots, -1, dtype=np.int64)
+        
+        fitness_score = self.fitness_engine.evaluate(genome)
+        
+        # Best possible score: every selected weight, no penalties
+        upper_bound = float(self.problem.weights[courses].sum()) if courses else 0.0
+        
+        self.metadata = {
+            'algorithm': 'exact',
+            'upper_bound': upper_bound,
+            'optimal': bool(np.isclose(fitness_score, upper_bound)),
+            'elapsed_ms': (time.perf_counter() - start_time) * 1000,
+            'evaluations': 1
+        }
+        
+        return self.problem.decode(genome), fitness_score
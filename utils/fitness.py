@@ -0,0 +1,180 @@
+from collections import OrderedDict
+import numpy as np
+
+# Penalty for a run of the same course in consecutive slots of one day,
+# keyed by run length. Runs longer than five slots get the maximum penalty.
+RUN_PENALTIES = {2: 4, 3: 6, 4: 8, 5: 10}
+
+
+def _pair_penalties():
+    """
+    Build the per-pair penalty table used by the vectorized run check.
+
+    A run of length n contains n - 1 adjacent equal pairs. Charging the k-th
+    pair of a run the difference between the penalties of runs of length k + 1
+    and k makes the pairs of a run add up to the run's total penalty.
+
+    Returns:
+        Numpy array indexed by the position of a pair within its run
+    """
+    max_length = max(RUN_PENALTIES)
+    table = np.zeros(max_length + 1)
+    previous = 0
+    for length in range(2, max_length + 1):
+        table[length - 1] = RUN_PENALTIES[length] - previous
+        previous = RUN_PENALTIES[length]
+    return table
+
+
+PAIR_PENALTIES = _pair_penalties()
+
+
+class FitnessEngine:
+    """
+    Vectorized fitness function shared by the routine optimizers.
+
+    A routine is encoded as one course index per slot (-1 for no course).
+    The fitness of a routine is the total weight of the distinct courses it
+    includes, minus penalties for runs of the same course within a day.
+    Whole populations are scored at once from a 2-D integer array of shape
+    (individuals x slots).
+    """
+
+    def __init__(self, weights, day_starts):
+        """
+        Initialize the engine with precomputed course and slot data.
+
+        Args:
+            weights: Sequence of course weights, indexed like the genome values
+            day_starts: Boolean sequence, True for the first slot of each day;
+                the slots of a day must be contiguous and in chronological order
+        """
+        self.num_courses = len(weights)
+        self.num_slots = len(day_starts)
+
+        # Weight vector with a trailing zero for the "no course" column
+        self.weights = np.append(np.asarray(weights, dtype=float), 0.0)
+
+        # True where a slot follows another slot of the same day
+        self.same_day = ~np.asarray(day_starts, dtype=bool)[1:]
+
+    def evaluate_population(self, population):
+        """
+        Score a whole population of routines.
+
+        Args:
+            population: Array-like of shape (individuals, slots) with course
+                indices (-1 for no course)
+
+        Returns:
+            Numpy array with one fitness score per individual
+        """
+        genes = np.asarray(population, dtype=np.int64)
+        if genes.ndim == 1:
+            genes = genes[np.newaxis, :]
+        num_individuals = genes.shape[0]
+
+        # Map "no course" and out-of-range values to the sentinel column
+        assigned = (genes >= 0) & (genes < self.num_courses)
+        columns = np.where(assigned, genes, self.num_courses)
+
+        # Total weight of included courses (without duplicates)
+        included = np.zeros((num_individuals, self.num_courses + 1), dtype=bool)
+        included[np.arange(num_individuals)[:, np.newaxis], columns] = True
+        total_weight = included @ self.weights
+
+        # Adjacent slots of the same day holding the same course
+        same = (columns[:, 1:] == columns[:, :-1]) & assigned[:, 1:] & self.same_day
+
+        # Position of every equal pair within its run (0 where there is none)
+        counts = np.cumsum(same, axis=1)
+        resets = np.maximum.accumulate(np.where(same, 0, counts), axis=1)
+        run_position = np.minimum(counts - resets, len(PAIR_PENALTIES) - 1)
+        penalty = PAIR_PENALTIES[run_position].sum(axis=1)
+
+        # Final fitness score (weight - penalties)
+        return total_weight - penalty
+
+    def evaluate(self, individual):
+        """
+        Score a single routine.
+
+        Args:
+            individual: Sequence of course indices for each slot
+
+        Returns:
+            Fitness score as a float
+        """
+        return float(self.evaluate_population([individual])[0])
+
+
+class FitnessCache:
+    """
+    Bounded per-run cache of fitness scores keyed by genome.
+
+    Selection and crossover produce many exact copies of the same routine,
+    so each distinct genome is scored once per run. Genomes are keyed by a
+    compact int16 byte encoding and the least recently used entries are
+    dropped once the cache is full.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._scores = OrderedDict()
+
+    def evaluate_population(self, population, evaluate):
+        """
+        Score a population, evaluating only genomes not seen before.
+
+        Args:
+            population: Array-like of shape (individuals, slots)
+            evaluate: Callable scoring a 2-D array of genomes in one batch
+
+        Returns:
+            Numpy array with one fitness score per individual
+        """
+        genomes = np.asarray(population, dtype=np.int64)
+        if genomes.ndim == 1:
+            genomes = genomes[np.newaxis, :]
+        # One int16 byte string per genome, sliced from a single buffer
+        buffer = genomes.astype(np.int16).tobytes()
+        width = genomes.shape[1] * 2
+        keys = [buffer[start:start + width] for start in range(0, len(buffer), width)] if width else [b''] * len(genomes)
+        scores = [0.0] * len(keys)
+
+        # Group the genomes that still need scoring (duplicates count as hits)
+        pending = OrderedDict()
+        for i, key in enumerate(keys):
+            score = self._scores.get(key)
+            if score is not None:
+                self._scores.move_to_end(key)
+                scores[i] = score
+                self.hits += 1
+            elif key in pending:
+                pending[key].append(i)
+                self.hits += 1
+            else:
+                pending[key] = [i]
+                self.misses += 1
+
+        if pending:
+            rows = [indices[0] for indices in pending.values()]
+            fresh_scores = evaluate(genomes[rows])
+            for (key, indices), score in zip(pending.items(), fresh_scores.tolist()):
+                for i in indices:
+                    scores[i] = score
+                self._scores[key] = score
+            while len(self._scores) > self.max_size:
+                self._scores.popitem(last=False)
+
+        return np.array(scores)
+
+    def stats(self):
+        """Return the hit/miss counters for the optimizer's result metadata."""
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_size': len(self._scores)
+        }
@@ -1,205 +1,391 @@
-import random
+import secrets
+import threading
+import time
 import numpy as np
-from deap import base, creator, tools, algorithms
+from deap import base, creator, tools
+from utils.fitness import FitnessEngine, FitnessCache
+
+_deap_lock = threading.Lock()
+
+def _create_deap_types():
+    """
+    Create the DEAP fitness and individual classes once per process.
+    
+    The classes live in the process-global ``creator`` module, so they are
+    never deleted or re-created while other threads may be using them.
+    """
+    with _deap_lock:
+        if not hasattr(creator, "FitnessMax"):
+            creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+        if not hasattr(creator, "Individual"):
+            creator.create("Individual", list, fitness=creator.FitnessMax)
+
+_create_deap_types()
+
+def _evolve_island(problem, genomes, fitnesses, generations, seed):
+    """
+    Evolve one island of the island-model GA for a number of generations.
+    
+    Runs in a worker process, so the population travels as plain arrays.
+    
+    Args:
+        problem: RoutineProblem snapshot
+        genomes: Array of shape (individuals, slots) of the island's population
+        fitnesses: Fitness score of each genome
+        generations: Number of generations to evolve
+        seed: Seed of this island's generator for this epoch
+        
+    Returns:
+        Tuple of the evolved genomes, their fitness scores, the best genome
+        and fitness seen during the epoch and the number of evaluations
+    """
+    optimizer = GeneticOptimizer(problem, seed=seed)
+    optimizer.fitness_cache = FitnessCache(optimizer.fitness_cache_size)
+    
+    # The generations have no elitism, so the island keeps its own hall of
+    # fame to not lose a best individual found in the middle of the epoch
+    hof = tools.HallOfFame(1)
+    for _ in range(generations):
+        genomes, fitnesses = optimizer._next_generation(genomes, fitnesses)
+        optimizer._update_hall_of_fame(hof, genomes, fitnesses)
+    
+    return (genomes, fitnesses, list(hof[0]), hof[0].fitness.values[0],
+            optimizer.fitness_cache.misses)
 
 class GeneticOptimizer:
     """
     A genetic algorithm optimizer for study routines.
     The optimizer generates an optimal study routine for the evening (6 PM - 12 AM)
     based on course weights and study constraints.
+    
+    The population is kept as an integer array of shape (individuals x slots)
+    and every generation is bred with whole-array operations that follow
+    DEAP's eaSimple: tournament selection, two-point crossover of neighbouring
+    pairs and per-gene mutation. Only the best routine found becomes a DEAP
+    individual, in the hall of fame.
     """
     
-    def __init__(self, courses, dinner_hour=8, days=None):
+    def __init__(self, problem, pool=None, seed=None):
         """
-        Initialize the genetic optimizer with courses and constraints.
+        Initialize the genetic optimizer with a routine problem snapshot.
         
         Args:
-            courses: List of course objects with course_code and current_weight attributes
-            dinner_hour: Hour reserved for dinner (6-11, representing 6 PM to 11 PM)
-            days: List of days to optimize for (defaults to all days of the week)
+            problem: RoutineProblem holding the course codes, weights, days and dinner hour
+            pool: Optional OptimizerPool the islands of the island model run on
+            seed: Optional seed of the optimizer's random generator; a random
+                seed is drawn (and reported in metadata) when omitted
         """
-        self.courses = courses
-        self.course_codes = [course.course_code for course in courses]
-        self.course_weights = {course.course_code: course.current_weight for course in courses}
-        self.dinner_hour = dinner_hour
-        self.days = days or ["Saturday", "Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
-        
-        # Each slot is identified by day_hour
-        self.slots = []
-        for day in self.days:
-            for hour in range(6, 12):  # 6 PM to 11 PM
-                if hour != dinner_hour:  # Skip dinner hour
-                    self.slots.append(f"{day}_{hour}")
+        self.problem = problem
+        self.pool = pool
+        
+        # Every run draws from its own generator, never the global NumPy state
+        self.seed = seed if seed is not None else secrets.randbits(32)
+        self.rng = np.random.default_rng(self.seed)
+        self.course_codes = problem.course_codes
+        self.dinner_hour = problem.dinner_hour
+        self.days = problem.days
         
         # Number of slots available
-        self.num_slots = len(self.slots)
-        self.num_courses = len(self.courses)
-        
-        # Maximum number of consecutive same-course slots allowed
-        self.max_consecutive_slots = 5
-    
-    def _setup_deap(self):
-        """Set up the DEAP evolutionary algorithm components."""
-        # Clean up any previous creation if they exist
-        if 'FitnessMax' in creator.__dict__:
-            del creator.FitnessMax
-        if 'Individual' in creator.__dict__:
-            del creator.Individual
-            
-        # Create fitness and individual classes
-        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
-        creator.create("Individual", list, fitness=creator.FitnessMax)
-        
-        # Initialize toolbox
-        self.toolbox = base.Toolbox()
-        
-        # Register gene (allele) and individual creation
-        self.toolbox.register("attr_course", self._random_course)
-        self.toolbox.register("individual", tools.initRepeat, creator.Individual, 
-                             self.toolbox.attr_course, n=self.num_slots)
-        self.toolbox.register("population", tools.initRepeat, list, self.toolbox.individual)
-        
-        # Register genetic operators
-        self.toolbox.register("evaluate", self._evaluate_fitness)
-        self.toolbox.register("mate", tools.cxTwoPoint)
-        self.toolbox.register("mutate", self._mutate, indpb=0.2)
-        self.toolbox.register("select", tools.selTournament, tournsize=3)
-    
-    def _random_course(self):
-        """Generate a random course from available courses."""
-        # -1 means no course assigned to the slot
-        if not self.courses:
-            return -1
-        else:
-            return random.randint(0, self.num_courses - 1)
+        self.num_slots = problem.num_slots
+        self.num_courses = problem.num_courses
+        
+        # Fitness engine built once from the snapshot's weight vector
+        self.fitness_engine = FitnessEngine(problem.weights, problem.day_starts)
+        
+        # GA parameters
+        self.cxpb = 0.7       # probability of mating a pair
+        self.mutpb = 0.2      # probability of mutating an individual
+        self.indpb = 0.2      # probability of mutating each gene of a mutant
+        self.tournsize = 3    # aspirants per tournament
+        
+        # Warm start: share of the initial population seeded from a previous
+        # routine, and the mutation rate used to spread the seeds around it
+        self.warm_start_fraction = 0.25
+        self.warm_start_indpb = 0.1
+        
+        # Island model: individuals sent to the next island at each migration
+        self.migration_size = 2
+        
+        # Maximum number of distinct genomes remembered by the fitness cache
+        self.fitness_cache_size = 10000
+        
+        # Details of the last optimize() run
+        self.metadata = {}
     
-    def _mutate(self, individual, indpb):
-        """Custom mutation operator that randomly changes course assignments."""
-        for i in range(len(individual)):
-            if random.random() < indpb:
-                individual[i] = self._random_course()
-        return individual,
+    def _random_genomes(self, count):
+        """Generate random genomes; -1 means no course assigned to the slot."""
+        if not self.num_courses:
+            return np.full((count, self.num_slots), -1, dtype=np.int64)
+        return self.rng.integers(0, self.num_courses, size=(count, self.num_slots))
     
-    def _evaluate_fitness(self, individual):
+    def _mutate(self, genomes, rows, indpb):
         """
-        Evaluate the fitness of a study routine.
+        Give each gene of the selected rows a new random course with probability indpb.
         
-        The fitness is based on:
-        1. Total weight of courses included in the routine
-        2. Penalties for consecutive same-course slots
+        Args:
+            genomes: Array of genomes, changed in place
+            rows: Boolean mask of the individuals to mutate
+            indpb: Mutation probability of each gene
+        """
+        if not self.num_courses:
+            return
+        genes = (self.rng.random(genomes.shape) < indpb) & rows[:, np.newaxis]
+        genomes[genes] = self.rng.integers(0, self.num_courses, size=int(genes.sum()))
+    
+    def _crossover(self, genomes, pairs):
+        """
+        Two-point crossover (as DEAP's cxTwoPoint) of the given neighbouring pairs.
         
-        Returns:
-            Tuple containing the fitness score
+        Args:
+            genomes: Array of genomes, changed in place
+            pairs: Indices of the first individual of each pair to mate
         """
-        # Get the latest course weights directly from the course objects
-        course_weights = {course.course_code: course.current_weight for course in self.courses}
-        
-        # Convert individual indices to course codes
-        routine = {}
-        for i, course_idx in enumerate(individual):
-            # -1 means no course
-            if course_idx >= 0 and course_idx < self.num_courses:
-                routine[self.slots[i]] = self.course_codes[course_idx]
-        
-        # Calculate total weight of included courses (without duplicates)
-        included_courses = set(routine.values())
-        total_weight = sum(course_weights.get(course, 0) for course in included_courses)
-        
-        # Apply penalties for consecutive same-course slots
-        penalty = 0
-        
-        # Check consecutive slots per day
-        for day in self.days:
-            day_slots = [h for h in range(6, 12) if h != self.dinner_hour]
-            day_slots.sort()  # Ensure slots are in order
-            
-            # Check for consecutive slots with the same course
-            consecutive_count = 1
-            prev_course = None
+        size = self.num_slots
+        if size < 2 or not len(pairs):
+            return
+        cxpoint1 = self.rng.integers(1, size + 1, size=len(pairs))
+        cxpoint2 = self.rng.integers(1, size, size=len(pairs))
+        cxpoint2 = np.where(cxpoint2 >= cxpoint1, cxpoint2 + 1, cxpoint2)
+        low = np.minimum(cxpoint1, cxpoint2)[:, np.newaxis]
+        high = np.maximum(cxpoint1, cxpoint2)[:, np.newaxis]
+        
+        slots = np.arange(size)
+        swap = (slots >= low) & (slots < high)
+        first, second = genomes[pairs], genomes[pairs + 1]
+        genomes[pairs] = np.where(swap, second, first)
+        genomes[pairs + 1] = np.where(swap, first, second)
+    
+    def _select(self, fitnesses, k):
+        """Tournament selection (as DEAP's selTournament); returns the indices of the winners."""
+        aspirants = self.rng.integers(0, len(fitnesses), size=(k, self.tournsize))
+        return aspirants[np.arange(k), np.argmax(fitnesses[aspirants], axis=1)]
+    
+    def _evaluate(self, genomes):
+        """Score genomes, serving the ones already seen in this run from the fitness cache."""
+        if not len(genomes):
+            return np.empty(0)
+        return self.fitness_cache.evaluate_population(genomes, self.fitness_engine.evaluate_population)
+    
+    def _seed_population(self, population_size, initial_solution):
+        """
+        Build the initial population, warm-started from a previous routine.
+        
+        The previous routine is kept unchanged once and mutated copies of it
+        fill ``warm_start_fraction`` of the population; the rest is random so
+        the search can still leave the old optimum.
+        
+        Args:
+            population_size: Size of the population
+            initial_solution: Genome of the previous routine, or None
             
-            for hour in day_slots:
-                slot_key = f"{day}_{hour}"
-                current_course = routine.get(slot_key)
-                
-                if current_course and current_course == prev_course:
-                    consecutive_count += 1
-                else:
-                    # Apply penalty for the previous sequence if needed
-                    if consecutive_count > 1:
-                        if consecutive_count == 2:
-                            penalty += 4
-                        elif consecutive_count == 3:
-                            penalty += 6
-                        elif consecutive_count == 4:
-                            penalty += 8
-                        elif consecutive_count >= 5:
-                            penalty += 10
-                    consecutive_count = 1
-                
-                prev_course = current_course
+        Returns:
+            Array of genomes of shape (population_size, slots)
+        """
+        if initial_solution is None or population_size < 1:
+            return self._random_genomes(population_size)
+        
+        num_seeded = max(1, int(population_size * self.warm_start_fraction))
+        seeded = np.tile(np.asarray(initial_solution, dtype=np.int64), (num_seeded, 1))
+        mutants = np.arange(num_seeded) > 0
+        self._mutate(seeded, mutants, self.warm_start_indpb)
+        return np.vstack([seeded, self._random_genomes(population_size - num_seeded)])
+    
+    def _next_generation(self, genomes, fitnesses):
+        """
+        Breed and evaluate the next generation (same steps as DEAP's eaSimple).
+        
+        Returns:
+            Tuple of the offspring genomes and their fitness scores
+        """
+        size = len(genomes)
+        winners = self._select(fitnesses, size)
+        offspring = genomes[winners]
+        offspring_fitnesses = fitnesses[winners]
+        invalid = np.zeros(size, dtype=bool)
+        
+        # Mate neighbouring pairs
+        pairs = np.arange(0, size - 1, 2)
+        pairs = pairs[self.rng.random(len(pairs)) < self.cxpb]
+        self._crossover(offspring, pairs)
+        invalid[pairs] = invalid[pairs + 1] = True
+        
+        # Mutate individuals
+        mutants = self.rng.random(size) < self.mutpb
+        self._mutate(offspring, mutants, self.indpb)
+        invalid |= mutants
+        
+        offspring_fitnesses[invalid] = self._evaluate(offspring[invalid])
+        return offspring, offspring_fitnesses
+    
+    @staticmethod
+    def _update_hall_of_fame(hof, genomes, fitnesses):
+        """Add the best genome of a population to the hall of fame if it beats the current best."""
+        best = int(np.argmax(fitnesses))
+        if len(hof) and fitnesses[best] <= hof[0].fitness.values[0]:
+            return
+        individual = creator.Individual(genomes[best].tolist())
+        individual.fitness.values = (float(fitnesses[best]),)
+        hof.update([individual])
+    
+    def _evolve_islands(self, islands, generations):
+        """
+        Evolve every island for a number of generations, in parallel on the pool if enabled.
+        
+        Args:
+            islands: List of (genomes, fitnesses) island populations
+            generations: Number of generations to evolve each island
             
-            # Check final sequence
-            if consecutive_count > 1:
-                if consecutive_count == 2:
-                    penalty += 4
-                elif consecutive_count == 3:
-                    penalty += 6
-                elif consecutive_count == 4:
-                    penalty += 8
-                elif consecutive_count >= 5:
-                    penalty += 10
-        
-        # Final fitness score (weight - penalties)
-        fitness = total_weight - penalty
-        
-        return (fitness,)
-    
-    def optimize(self, population_size=50, generations=40):
+        Returns:
+            Tuple of the evolved island populations, the (genome, fitness) best
+            of each island during the epoch and the number of evaluations
+        """
+        tasks = [(self.problem, genomes, fitnesses, generations, int(self.rng.integers(2 ** 32)))
+                 for genomes, fitnesses in islands]
+        if self.pool is not None and self.pool.enabled:
+            results = self.pool.starmap(_evolve_island, tasks)
+        else:
+            results = [_evolve_island(*task) for task in tasks]
+        
+        evolved = [(genomes, fitnesses) for genomes, fitnesses, _, _, _ in results]
+        bests = [(best_genome, best_fitness) for _, _, best_genome, best_fitness, _ in results]
+        evaluations = sum(island_evaluations for _, _, _, _, island_evaluations in results)
+        return evolved, bests, evaluations
+    
+    def _migrate(self, islands):
+        """Ring migration: the best individuals of each island replace the worst of the next one."""
+        emigrants = []
+        for genomes, fitnesses in islands:
+            best = np.argsort(-fitnesses, kind='stable')[:self.migration_size]
+            emigrants.append((genomes[best], fitnesses[best]))
+        
+        for idx, (genomes, fitnesses) in enumerate(islands):
+            incoming_genomes, incoming_fitnesses = emigrants[idx - 1]
+            worst = np.argsort(fitnesses, kind='stable')[:len(incoming_fitnesses)]
+            genomes[worst] = incoming_genomes
+            fitnesses[worst] = incoming_fitnesses
+    
+    def _record(self, generation, islands):
+        """Record the fitness statistics of all islands in the logbook."""
+        values = [value for _, fitnesses in islands for value in fitnesses.tolist()]
+        self.logbook.record(gen=generation, avg=sum(values) / len(values), min=min(values), max=max(values))
+    
+    def optimize(self, population_size=50, generations=40, time_budget_ms=None, patience=None,
+                 initial_solution=None, islands=1, migration_interval=5):
         """
         Run the genetic algorithm optimization.
         
+        The run stops early, returning the best routine found so far, when
+        the time budget is used up or when the best fitness has not improved
+        for ``patience`` generations. ``metadata['generations_run']`` reports
+        how many generations actually ran.
+        
+        Passing the genome of a previous routine (see RoutineProblem.encode)
+        warm-starts the search, which converges much faster after a small
+        weight change than a fully random start.
+        
+        Runs with the same seed, problem and arguments return the same
+        routine, unless they are cut short by the time budget.
+        
+        With ``islands`` > 1 the island model is used: each island is a
+        population of ``population_size`` evolving on its own worker process
+        (when the pool is enabled), and every ``migration_interval``
+        generations the best individuals of each island migrate to the next
+        one. Each island keeps a hall of fame during its epoch, and their
+        bests are merged into a hall of fame shared by all islands.
+        
         Args:
-            population_size: Size of the population
-            generations: Number of generations to evolve
+            population_size: Size of the population (of each island)
+            generations: Maximum number of generations to evolve
+            time_budget_ms: Optional wall-clock budget in milliseconds
+            patience: Optional number of generations without improvement before stopping
+            initial_solution: Optional genome of a previous routine for the same layout
+            islands: Number of island populations
+            migration_interval: Generations between migrations of the island model
             
         Returns:
             Tuple containing:
             - Dictionary mapping slot keys to course codes for the optimized routine
             - Final fitness score
         """
-        # Update course weights before optimization
-        self.course_weights = {course.course_code: course.current_weight for course in self.courses}
+        start_time = time.perf_counter()
+        deadline = start_time + time_budget_ms / 1000 if time_budget_ms else None
         
-        # Set up DEAP components every time to ensure fresh state
-        self._setup_deap()
+        # Restart the generator so every run with this seed is reproducible
+        self.rng = np.random.default_rng(self.seed)
+        self.fitness_cache = FitnessCache(self.fitness_cache_size)
         
-        # Create initial population
-        pop = self.toolbox.population(n=population_size)
+        # Create and evaluate the initial population of every island
+        populations = [self._seed_population(population_size, initial_solution) for _ in range(max(1, islands))]
+        islands = [(genomes, self._evaluate(genomes)) for genomes in populations]
+        island_evaluations = 0
         
-        # Keep track of the best individual
+        # Keep track of the best individual of all islands
         hof = tools.HallOfFame(1)
+        for genomes, fitnesses in islands:
+            self._update_hall_of_fame(hof, genomes, fitnesses)
+        best_fitness = hof[0].fitness.values[0]
         
         # Track statistics
-        stats = tools.Statistics(lambda ind: ind.fitness.values)
-        stats.register("avg", np.mean)
-        stats.register("min", np.min)
-        stats.register("max", np.max)
+        self.logbook = tools.Logbook()
+        self._record(0, islands)
         
-        # Run the algorithm
-        algorithms.eaSimple(pop, self.toolbox, cxpb=0.7, mutpb=0.2, 
-                           ngen=generations, stats=stats, halloffame=hof, verbose=False)
+        # A single population evolves in this thread one generation at a
+        # time; islands evolve migration_interval generations per epoch
+        step = max(1, migration_interval) if len(islands) > 1 else 1
+        
+        generations_run = 0
+        stale_generations = 0
+        stop_reason = None
+        while generations_run < generations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                stop_reason = 'time_budget'
+                break
+            
+            epoch = min(step, generations - generations_run)
+            if len(islands) > 1:
+                islands, bests, evaluations = self._evolve_islands(islands, epoch)
+                island_evaluations += evaluations
+                self._migrate(islands)
+                
+                # Merge the best of every island into the shared hall of fame
+                best_genomes = np.array([genome for genome, _ in bests])
+                best_fitnesses = np.array([fitness for _, fitness in bests])
+                self._update_hall_of_fame(hof, best_genomes, best_fitnesses)
+            else:
+                islands[0] = self._next_generation(*islands[0])
+                self._update_hall_of_fame(hof, *islands[0])
+            generations_run += epoch
+            self._record(generations_run, islands)
+            
+            # Stop once the best fitness has converged
+            if hof[0].fitness.values[0] > best_fitness:
+                best_fitness = hof[0].fitness.values[0]
+                stale_generations = 0
+            else:
+                stale_generations += epoch
+                if patience and stale_generations >= patience:
+                    stop_reason = 'converged'
+                    break
         
         # Get the best solution
         best_individual = hof[0]
         
         # Convert to a usable routine
-        optimized_routine = {}
-        for i, course_idx in enumerate(best_individual):
-            if course_idx >= 0 and course_idx < self.num_courses:
-                slot_key = self.slots[i]
-                optimized_routine[slot_key] = self.course_codes[course_idx]
+        optimized_routine = self.problem.decode(best_individual)
         
         # Get the fitness score
         fitness_score = best_individual.fitness.values[0]
         
-        return optimized_routine, fitness_score 
\ No newline at end of file
+        self.metadata = {
+            'algorithm': 'genetic',
+            'seed': self.seed,
+            'generations_run': generations_run,
+            'stop_reason': stop_reason,
+            'warm_start': initial_solution is not None,
+            'islands': len(islands),
+            'elapsed_ms': (time.perf_counter() - start_time) * 1000,
+            'evaluations': self.fitness_cache.misses + island_evaluations,
+            **self.fitness_cache.stats()
+        }
+        
+        return optimized_routine, fitness_score
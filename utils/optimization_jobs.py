@@ -0,0 +1,182 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobStatus:
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+
+class QueueFullError(Exception):
+    """Raised when the optimization queue cannot accept another job."""
+
+
+class JobInProgressError(Exception):
+    """Raised when a user submits a job while an earlier one is unfinished."""
+
+    def __init__(self, job):
+        self.job = job
+        super().__init__('Your previous optimization is still running. Please wait for it to finish.')
+
+
+class OptimizationJob:
+    """A single routine optimization submitted to the background queue."""
+
+    def __init__(self, user_id, algorithm, params=None):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.algorithm = algorithm
+        self.params = params or {}
+        self.status = JobStatus.PENDING
+        self.routine = None
+        self.fitness_score = None
+        self.metadata = {}
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def is_finished(self):
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def to_dict(self):
+        """Serialize the job for the status endpoint."""
+        data = {
+            'id': self.id,
+            'status': self.status,
+            'algorithm': self.algorithm,
+            'params': self.params,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if self.status == JobStatus.COMPLETED:
+            data['fitness_score'] = self.fitness_score
+            data['routine'] = self.routine
+            data['metadata'] = self.metadata
+        elif self.status == JobStatus.FAILED:
+            data['error'] = self.error
+        return data
+
+
+class OptimizationJobQueue:
+    """
+    Bounded background executor for routine optimizations.
+
+    Jobs run on a fixed number of worker threads so a burst of requests can
+    not tie up the web workers. Finished jobs are kept for a while so the
+    user can pick up the result, then pruned.
+    """
+
+    def __init__(self, app=None):
+        self._app = None
+        self._executor = None
+        self._jobs = {}
+        self._active_by_user = {}
+        self._lock = threading.Lock()
+        self.max_jobs = 0
+        self.max_queued = 0
+        self.result_ttl = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Create the worker pool from the app configuration."""
+        self._app = app
+        self.max_jobs = app.config.setdefault('MAX_OPTIMIZATION_JOBS', 4)
+        self.max_queued = app.config.setdefault('MAX_QUEUED_OPTIMIZATION_JOBS', 100)
+        self.result_ttl = app.config.setdefault('OPTIMIZATION_JOB_TTL', 3600)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_jobs,
+                                            thread_name_prefix='optimizer')
+        app.extensions['optimization_jobs'] = self
+
+    def submit(self, user_id, algorithm, run, params=None):
+        """
+        Queue an optimization for a user.
+
+        Args:
+            user_id: ID of the user the result belongs to
+            algorithm: Name of the optimization algorithm
+            run: Callable returning a (routine, fitness_score, metadata) tuple
+            params: Optional dictionary describing the search parameters
+
+        Returns:
+            The OptimizationJob
+
+        Raises:
+            JobInProgressError: If the user already has an unfinished job
+            QueueFullError: If too many jobs are waiting to run
+        """
+        with self._lock:
+            self._prune()
+
+            active = self._active_job(user_id)
+            if active is not None:
+                raise JobInProgressError(active)
+
+            unfinished = sum(1 for job in self._jobs.values() if not job.is_finished)
+            if unfinished >= self.max_jobs + self.max_queued:
+                raise QueueFullError('The optimizer is busy. Please try again in a moment.')
+
+            job = OptimizationJob(user_id, algorithm, params)
+            self._jobs[job.id] = job
+            self._active_by_user[user_id] = job.id
+
+        self._executor.submit(self._run_job, job, run)
+        return job
+
+    def get(self, job_id):
+        """Return the job with the given ID, or None if it is unknown or pruned."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_job(self, user_id):
+        """Return the user's unfinished job, or None if there is none."""
+        with self._lock:
+            return self._active_job(user_id)
+
+    def _active_job(self, user_id):
+        """Caller holds the lock."""
+        job = self._jobs.get(self._active_by_user.get(user_id))
+        if job is None or job.is_finished:
+            return None
+        return job
+
+    def _run_job(self, job, run):
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        try:
+            with self._app.app_context():
+                routine, fitness_score, metadata = run()
+            job.routine = routine
+            job.fitness_score = float(fitness_score)
+            job.metadata = metadata
+            # finished_at is set before the status so _prune never sees a
+            # finished job without it
+            job.finished_at = time.time()
+            job.status = JobStatus.COMPLETED
+        except Exception as e:
+            job.error = str(e)
+            job.finished_at = time.time()
+            job.status = JobStatus.FAILED
+            print(f"Error in optimization job {job.id}: {str(e)}")
+
+    def _prune(self):
+        """Drop finished jobs older than the result TTL. Caller holds the lock."""
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.is_finished and job.finished_at < cutoff]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if self._active_by_user.get(job.user_id) == job_id:
+                del self._active_by_user[job.user_id]
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
@@ -0,0 +1,70 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _warm_up():
+    """No-op task used to start the worker processes ahead of the first request."""
+    return True
+
+
+class OptimizerPool:
+    """
+    Persistent process pool for parallel optimization work.
+
+    The pool is created once at app startup and shared by all optimization
+    runs. It runs whole units of work: the islands of the island-model GA
+    (one island's epoch per task) and chunks of batch re-optimizations.
+    Single fitness batches are not worth sending, since scoring a whole
+    generation takes well under a millisecond. Tasks carry plain arrays and
+    the picklable RoutineProblem, so the workers never need the DEAP creator
+    classes. Parallel mode is opt-in: with OPTIMIZER_PROCESSES set to 0 (the
+    default) every task runs in the calling thread.
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self.processes = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Start the worker processes from the app configuration."""
+        self.processes = app.config.setdefault('OPTIMIZER_PROCESSES', 0)
+        app.extensions['optimizer_pool'] = self
+
+        if self.processes > 0 and self._executor is None:
+            # Spawned workers do not inherit locks held by the web server's threads
+            context = multiprocessing.get_context('spawn')
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+            for _ in range(self.processes):
+                self._executor.submit(_warm_up)
+
+    @property
+    def enabled(self):
+        return self._executor is not None
+
+    def submit(self, fn, *args):
+        """Run one task on a worker and return its future. The pool must be enabled."""
+        return self._executor.submit(fn, *args)
+
+    def starmap(self, fn, tasks):
+        """
+        Run independent tasks on the workers.
+
+        Args:
+            fn: Picklable module-level function
+            tasks: List of argument tuples, one per call
+
+        Returns:
+            List of results in the order of the tasks
+        """
+        if not self.enabled:
+            return [fn(*args) for args in tasks]
+        futures = [self.submit(fn, *args) for args in tasks]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
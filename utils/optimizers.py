@@ -0,0 +1,52 @@
+# Algorithms selectable in the optimization form
+ALGORITHMS = ('genetic', 'ant_colony', 'exact')
+
+
+def create_optimizer(algorithm, problem, pool=None, seed=None, deposit_strategy=None):
+    """
+    Build the optimizer for an algorithm name.
+
+    Args:
+        algorithm: 'genetic', 'ant_colony' or 'exact'
+        problem: RoutineProblem snapshot
+        pool: Optional OptimizerPool for parallel fitness evaluation (genetic only)
+        seed: Optional random seed (genetic and ant colony)
+        deposit_strategy: Optional pheromone deposit strategy (ant colony only)
+
+    Returns:
+        Optimizer exposing optimize() and metadata
+
+    Raises:
+        ValueError: If the algorithm is unknown
+    """
+    if algorithm == 'genetic':
+        from utils.genetic_optimizer import GeneticOptimizer
+        return GeneticOptimizer(problem, pool=pool, seed=seed)
+    if algorithm == 'ant_colony':
+        from utils.ant_colony_optimizer import AntColonyOptimizer
+        return AntColonyOptimizer(problem, deposit_strategy=deposit_strategy or AntColonyOptimizer.DEPOSIT_PROPORTIONAL,
+                                  seed=seed)
+    if algorithm == 'exact':
+        from utils.exact_optimizer import ExactOptimizer
+        return ExactOptimizer(problem)
+    raise ValueError(f"Unknown optimization algorithm: {algorithm}")
+
+
+def optimize_routine(algorithm, problem, params, options=None):
+    """
+    Run one optimization from plain arguments.
+
+    Module-level so it can run in a worker process.
+
+    Args:
+        algorithm: Name of the optimization algorithm
+        problem: RoutineProblem snapshot
+        params: Keyword arguments of optimize()
+        options: Keyword arguments of create_optimizer()
+
+    Returns:
+        Tuple of the routine dictionary, its fitness score and the optimizer metadata
+    """
+    optimizer = create_optimizer(algorithm, problem, **(options or {}))
+    routine, fitness_score = optimizer.optimize(**params)
+    return routine, fitness_score, optimizer.metadata
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Cached files are named after their key: a SHA-256 hex digest
+_KEY_LENGTH = 64
+
+
+class PDFCache:
+    """
+    Content-addressed disk cache of rendered PDFs.
+
+    The key is a hash of everything that determines the PDF (the rendered
+    HTML, the page layout version and the engine), so an unchanged routine
+    is never rendered twice and the key doubles as the download's ETag.
+    The total size is capped; the least recently used files are evicted
+    first.
+    """
+
+    def __init__(self, app=None):
+        self.directory = None
+        self.max_bytes = 0
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Open the cache directory from the app configuration."""
+        self.directory = app.config.setdefault('PDF_CACHE_DIR', os.path.join(app.instance_path, 'pdf_cache'))
+        self.max_bytes = app.config.setdefault('PDF_CACHE_MAX_BYTES', 50 * 1024 * 1024)
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+        app.extensions['pdf_cache'] = self
+
+    @staticmethod
+    def make_key(html, layout_version, engine):
+        """
+        Build the cache key (and ETag) of a PDF.
+
+        Args:
+            html: HTML document the PDF is rendered from
+            layout_version: Version of the renderer's page layout
+            engine: Name of the PDF engine
+
+        Returns:
+            Hex digest identifying the PDF
+        """
+        digest = hashlib.sha256(f"{layout_version}:{engine}:".encode('utf-8'))
+        digest.update(html.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _load_index(self):
+        """Index the files left by earlier runs, oldest first."""
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and len(entry.name) == _KEY_LENGTH:
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            for _, key, size in sorted(files):
+                self._entries[key] = size
+                self._total_bytes += size
+            self._evict()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """Return the cached PDF bytes, or None on a miss."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+            os.utime(self._path(key))
+            return data
+        except OSError:
+            with self._lock:
+                self._discard(key)
+            return None
+
+    def set(self, key, data):
+        """Store a rendered PDF, evicting the least recently used files if the cache is full."""
+        if len(data) > self.max_bytes:
+            return
+
+        # Write to a temporary file first so readers never see a partial PDF
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        """Remove files until the cache fits its size cap. Caller holds the lock."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._discard(key)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _discard(self, key):
+        """Drop a key from the index. Caller holds the lock."""
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._discard(key)
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
@@ -0,0 +1,122 @@
+import os
+import platform
+import shutil
+import threading
+
+# Common wkhtmltopdf install locations on Windows
+WKHTMLTOPDF_WINDOWS_PATHS = (
+    r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe',
+    r'C:\Program Files (x86)\wkhtmltopdf\bin\wkhtmltopdf.exe'
+)
+
+# Page layout shared by both engines; bump the version when it changes so
+# cached PDFs are rendered again
+PAGE_SIZE = 'A4'
+PAGE_MARGIN = '0.75in'
+LAYOUT_VERSION = 1
+
+
+class RendererUnavailableError(Exception):
+    """Raised when neither WeasyPrint nor wkhtmltopdf is installed."""
+
+
+class RendererBusyError(Exception):
+    """Raised when no render slot frees up within the wait timeout."""
+
+
+class PDFRenderer:
+    """
+    Shared HTML to PDF renderer with a bounded number of concurrent renders.
+
+    WeasyPrint renders in-process when it is installed; otherwise the
+    wkhtmltopdf binary is used through pdfkit, writing the PDF to stdout
+    so no temporary files are involved. Either way at most
+    PDF_RENDER_CONCURRENCY renders run at once, so a burst of downloads
+    queues up briefly instead of saturating the CPU.
+    """
+
+    def __init__(self, app=None):
+        self._semaphore = threading.BoundedSemaphore(2)
+        self._engine = None
+        self._engine_lock = threading.Lock()
+        self.preferred_engine = 'auto'
+        self.wait_timeout = 30
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Set the concurrency limits from the app configuration."""
+        concurrency = app.config.setdefault('PDF_RENDER_CONCURRENCY', 2)
+        self.wait_timeout = app.config.setdefault('PDF_RENDER_TIMEOUT', 30)
+        self.preferred_engine = app.config.setdefault('PDF_ENGINE', 'auto')
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        app.extensions['pdf_renderer'] = self
+
+    def _load_engine(self):
+        """Find the PDF engine once; returns a (name, handle) tuple or None."""
+        if self.preferred_engine in ('auto', 'weasyprint'):
+            try:
+                import weasyprint
+                return 'weasyprint', weasyprint
+            except (ImportError, OSError):
+                # OSError: WeasyPrint is installed but its native libraries are missing
+                pass
+
+        if self.preferred_engine in ('auto', 'wkhtmltopdf'):
+            import pdfkit
+            path = shutil.which('wkhtmltopdf')
+            if path is None and platform.system() == 'Windows':
+                path = next((p for p in WKHTMLTOPDF_WINDOWS_PATHS if os.path.exists(p)), None)
+            if path is not None:
+                return 'wkhtmltopdf', pdfkit.configuration(wkhtmltopdf=path)
+
+        return None
+
+    @property
+    def engine(self):
+        """Name of the engine in use, or None if no engine is available."""
+        with self._engine_lock:
+            if self._engine is None:
+                self._engine = self._load_engine() or ()
+        return self._engine[0] if self._engine else None
+
+    def render(self, html):
+        """
+        Render an HTML document to PDF.
+
+        Args:
+            html: Complete HTML document
+
+        Returns:
+            The PDF as bytes
+
+        Raises:
+            RendererUnavailableError: If no PDF engine is installed
+            RendererBusyError: If all render slots stay busy for wait_timeout seconds
+        """
+        engine = self.engine
+        if engine is None:
+            raise RendererUnavailableError('No PDF engine found. Please install WeasyPrint or wkhtmltopdf.')
+
+        if not self._semaphore.acquire(timeout=self.wait_timeout):
+            raise RendererBusyError('The PDF service is busy. Please try again in a moment.')
+        try:
+            if engine == 'weasyprint':
+                weasyprint = self._engine[1]
+                page = weasyprint.CSS(string=f'@page {{ size: {PAGE_SIZE}; margin: {PAGE_MARGIN}; }}')
+                return weasyprint.HTML(string=html).write_pdf(stylesheets=[page])
+
+            import pdfkit
+            options = {
+                'page-size': PAGE_SIZE,
+                'margin-top': PAGE_MARGIN,
+                'margin-right': PAGE_MARGIN,
+                'margin-bottom': PAGE_MARGIN,
+                'margin-left': PAGE_MARGIN,
+                'encoding': 'UTF-8'
+            }
+            # output_path=False returns the PDF bytes from wkhtmltopdf's stdout
+            return pdfkit.from_string(html, False, options=options, configuration=self._engine[1])
+        finally:
+            self._semaphore.release()
@@ -0,0 +1,122 @@
+import heapq
+import itertools
+import threading
+from datetime import datetime
+
+
+class ReminderScheduler:
+    """
+    Sends event reminders and expires events at the moment they are due.
+
+    Pending work sits in a min-heap keyed on due time, instead of a worker
+    scanning the event table on a fixed interval. Pending events are loaded
+    once at start-up. After that, entries are added when students create
+    events and removed when they complete them. A single background thread
+    sleeps until the earliest entry is due.
+    """
+
+    REMIND = 'remind'
+    EXPIRE = 'expire'
+
+    def __init__(self, app=None):
+        self.app = None
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Bind the scheduler to the app whose database holds the events."""
+        self.app = app
+        app.extensions['reminder_scheduler'] = self
+
+    def start(self):
+        """Load every pending event and start the scheduler thread."""
+        from models.event import Event
+
+        with self.app.app_context():
+            for event in Event.query.filter_by(is_completed=False, is_expired=False).all():
+                self.schedule(event)
+
+        self._thread = threading.Thread(target=self._run, name='reminder-scheduler', daemon=True)
+        self._thread.start()
+
+    def schedule(self, event):
+        """
+        Add the reminder and expiry of an event, replacing earlier entries.
+
+        Reminders that are already due (an event added less than a day
+        ahead) are sent right away.
+        """
+        with self._condition:
+            if not event.email_notification_sent:
+                self._push(event.id, self.REMIND, event.reminder_due_at)
+            self._push(event.id, self.EXPIRE, event.event_date)
+
+    def cancel(self, event_id):
+        """Drop the pending entries of a completed or deleted event."""
+        with self._condition:
+            for kind in (self.REMIND, self.EXPIRE):
+                self._remove(event_id, kind)
+
+    def _push(self, event_id, kind, due_at):
+        """Add an entry and wake the thread if it is now the earliest. Caller holds the lock."""
+        self._remove(event_id, kind)
+        entry = [due_at, next(self._counter), event_id, kind]
+        self._entries[(event_id, kind)] = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._condition.notify()
+
+    def _remove(self, event_id, kind):
+        """Mark an entry as removed; it is skipped when it reaches the top. Caller holds the lock."""
+        entry = self._entries.pop((event_id, kind), None)
+        if entry is not None:
+            entry[2] = None
+
+    def _next_due(self):
+        """Block until an entry is due and pop it."""
+        with self._condition:
+            while True:
+                while self._heap and self._heap[0][2] is None:
+                    heapq.heappop(self._heap)
+
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+
+                delay = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+                if delay > 0:
+                    self._condition.wait(timeout=delay)
+                    continue
+
+                _, _, event_id, kind = heapq.heappop(self._heap)
+                del self._entries[(event_id, kind)]
+                return event_id, kind
+
+    def _run(self):
+        while True:
+            event_id, kind = self._next_due()
+            try:
+                self._fire(event_id, kind)
+            except Exception as e:
+                print(f"Error in reminder scheduler: {str(e)}")
+
+    def _fire(self, event_id, kind):
+        """Send the reminder or expire the event, if it is still pending."""
+        from extensions import db
+        from models.event import Event
+
+        with self.app.app_context():
+            event = db.session.get(Event, event_id)
+            if event is None:
+                return
+
+            if kind == self.REMIND and event.send_reminder():
+                print(f"{datetime.utcnow()}: Sent reminder for event {event_id}")
+            elif kind == self.EXPIRE and event.expire():
+                print(f"{datetime.utcnow()}: Marked event {event_id} as expired")
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class RoutineCache:
+    """
+    Server-side cache of optimized routines shared across requests.
+
+    Entries are keyed by a fingerprint of everything that determines the
+    search (courses, weights, dinner hour, days, algorithm and budget), so
+    pressing "Generate" again with unchanged inputs returns the stored
+    result instead of running a new search. Entries expire after a TTL and
+    the least recently used ones are evicted when the cache is full.
+    """
+
+    def __init__(self, app=None):
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.max_entries = 1024
+        self.ttl = 3600
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the cache limits from the app configuration."""
+        self.max_entries = app.config.setdefault('ROUTINE_CACHE_SIZE', 1024)
+        self.ttl = app.config.setdefault('ROUTINE_CACHE_TTL', 3600)
+        app.extensions['routine_cache'] = self
+
+    @staticmethod
+    def make_key(problem, algorithm, params):
+        """
+        Build the cache key for an optimization request.
+
+        Args:
+            problem: RoutineProblem snapshot
+            algorithm: Name of the optimization algorithm
+            params: Dictionary with the search budget
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps([problem.fingerprint(), algorithm, params], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached (routine, fitness_score) tuple, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            routine, fitness_score, stored_at, _ = entry
+            if time.time() - stored_at > self.ttl:
+                self._discard(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return routine, fitness_score
+
+    def set(self, key, routine, fitness_score, user_id=None):
+        """
+        Store an optimization result.
+
+        Args:
+            key: Cache key from make_key()
+            routine: Dictionary mapping slot keys to course codes
+            fitness_score: Fitness of the routine
+            user_id: Optional user the result was computed for, used by invalidate_user()
+        """
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (routine, fitness_score, time.time(), user_id)
+            if user_id is not None:
+                self._keys_by_user.setdefault(user_id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        """Drop the entries computed for a user whose courses or weights changed."""
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+
+    def _discard(self, key):
+        """Remove an entry and its user index. Caller holds the lock."""
+        user_id = self._entries.pop(key)[3]
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+
+
+class RoutineGrid:
+    """
+    Day x time-slot grid of a student's classes, as shown on the dashboard,
+    the guest routine and the class routine PDFs.
+
+    Courses are placed through a dictionary from (start, end) to time slot,
+    so placing a course costs one lookup however many slots there are. Grids
+    built for a user are memoized until that user's courses change.
+    """
+
+    def __init__(self, days, time_slots, max_entries=1024):
+        """
+        Initialize the grid layout.
+
+        Args:
+            days: Sequence of day names, in display order
+            time_slots: Sequence of ScheduleConfig time slots
+            max_entries: Maximum number of users whose grid is memoized
+        """
+        self.days = tuple(days)
+        self.time_slots = tuple(time_slots)
+        self.max_entries = max_entries
+
+        # Slot keys in display order, and (start, end) -> slot key for both
+        # 'HH:MM' strings (guest courses) and time values (ORM rows)
+        self.slot_keys = tuple(f"{slot['start']}-{slot['end']}" for slot in self.time_slots)
+        self._slots = {}
+        for slot, slot_key in zip(self.time_slots, self.slot_keys):
+            self._slots[(slot['start'], slot['end'])] = (slot_key, slot)
+            self._slots[(slot['start_time'], slot['end_time'])] = (slot_key, slot)
+
+        self._grids = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def course_entry(course):
+        """
+        Reduce a course to a hashable (code, days, start, end) tuple.
+
+        Args:
+            course: CourseDirectory row, or a guest course dict with
+                'course_code', 'days', 'start_time' and 'end_time'
+        """
+        if isinstance(course, dict):
+            return (course['course_code'], tuple(course['days']),
+                    course['start_time'], course['end_time'])
+        return (course.course_code, tuple(course.course_day.split(',')),
+                course.course_time_start, course.course_time_end)
+
+    def build(self, courses):
+        """
+        Build the routine grid for a list of courses.
+
+        Only courses that match a time slot exactly are placed.
+
+        Args:
+            courses: CourseDirectory rows or guest course dicts
+
+        Returns:
+            Dictionary mapping each day to a dictionary from slot key
+            ('HH:MM-HH:MM') to the list of courses in that slot
+        """
+        return self._build(tuple(self.course_entry(course) for course in courses))
+
+    def for_user(self, user_id, courses):
+        """
+        Return the routine grid of a user, reusing the last one built while
+        the user's courses are unchanged.
+
+        The returned grid is shared between requests and must not be modified.
+
+        Args:
+            user_id: ID of the user the courses belong to
+            courses: The user's CourseDirectory rows
+        """
+        entries = tuple(self.course_entry(course) for course in courses)
+        with self._lock:
+            cached = self._grids.get(user_id)
+            if cached is not None and cached[0] == entries:
+                self._grids.move_to_end(user_id)
+                return cached[1]
+
+        routine = self._build(entries)
+        with self._lock:
+            self._grids[user_id] = (entries, routine)
+            self._grids.move_to_end(user_id)
+            while len(self._grids) > self.max_entries:
+                self._grids.popitem(last=False)
+        return routine
+
+    def _build(self, entries):
+        routine = {day: {slot_key: [] for slot_key in self.slot_keys} for day in self.days}
+        for course_code, days, start, end in entries:
+            match = self._slots.get((start, end))
+            if match is None:
+                continue
+
+            slot_key, slot = match
+            placed = {
+                'course_code': course_code,
+                'start_time': slot['start'],
+                'end_time': slot['end']
+            }
+            for day in days:
+                if day in routine:
+                    routine[day][slot_key].append(placed)
+        return routine
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import numpy as np
+
+# Days the study routine is optimized for
+DEFAULT_DAYS = ("Saturday", "Sunday", "Monday", "Tuesday", "Wednesday", "Thursday")
+
+# Evening study hours (6 PM to 11 PM start times)
+STUDY_HOURS = tuple(range(6, 12))
+
+
+class RoutineProblem:
+    """
+    Immutable snapshot of everything the routine optimizers need.
+
+    The snapshot is built once per request from the student's courses, so the
+    optimizers never touch live ORM objects and can be pickled to worker
+    processes.
+    """
+
+    __slots__ = ('course_codes', 'weights', 'dinner_hour', 'days',
+                 'slot_days', 'slot_hours', 'slot_positions', 'day_starts')
+
+    def __init__(self, course_codes, weights, dinner_hour=8, days=None):
+        """
+        Initialize the problem snapshot.
+
+        Args:
+            course_codes: Sequence of course codes, indexed like the genome values
+            weights: Sequence of current course weights, in the same order
+            dinner_hour: Hour reserved for dinner (6-11, representing 6 PM to 11 PM)
+            days: List of days to optimize for (defaults to all days of the week)
+        """
+        if len(course_codes) != len(weights):
+            raise ValueError("Each course code needs exactly one weight")
+
+        weights = np.array(weights, dtype=float)
+        weights.flags.writeable = False
+        days = tuple(days or DEFAULT_DAYS)
+
+        # Slot metadata as integer tables: the search runs on slot indices only
+        day_hours = [hour for hour in STUDY_HOURS if hour != dinner_hour]  # Skip dinner hour
+        slots_per_day = len(day_hours)
+        slot_days = np.repeat(np.arange(len(days)), slots_per_day)
+        slot_hours = np.tile(day_hours, len(days))
+        slot_positions = np.tile(np.arange(slots_per_day), len(days))
+        day_starts = slot_positions == 0
+
+        for table in (slot_days, slot_hours, slot_positions, day_starts):
+            table.flags.writeable = False
+
+        object.__setattr__(self, 'course_codes', tuple(course_codes))
+        object.__setattr__(self, 'weights', weights)
+        object.__setattr__(self, 'dinner_hour', dinner_hour)
+        object.__setattr__(self, 'days', days)
+        object.__setattr__(self, 'slot_days', slot_days)
+        object.__setattr__(self, 'slot_hours', slot_hours)
+        object.__setattr__(self, 'slot_positions', slot_positions)
+        object.__setattr__(self, 'day_starts', day_starts)
+
+    @classmethod
+    def from_courses(cls, courses, dinner_hour=8, days=None):
+        """
+        Build a snapshot from course objects.
+
+        Args:
+            courses: List of course objects with course_code and current_weight attributes
+            dinner_hour: Hour reserved for dinner
+            days: List of days to optimize for
+
+        Returns:
+            RoutineProblem instance
+        """
+        return cls(
+            [course.course_code for course in courses],
+            [course.current_weight for course in courses],
+            dinner_hour=dinner_hour,
+            days=days
+        )
+
+    @property
+    def num_courses(self):
+        return len(self.course_codes)
+
+    @property
+    def num_slots(self):
+        return len(self.slot_days)
+
+    def slot_key(self, slot_idx):
+        """Return the "Saturday_6"-style key of a slot, used by the stored routines."""
+        return f"{self.days[self.slot_days[slot_idx]]}_{self.slot_hours[slot_idx]}"
+
+    def decode(self, genome):
+        """
+        Convert a genome into a routine dictionary.
+
+        Args:
+            genome: Sequence of course indices for each slot (-1 for no course)
+
+        Returns:
+            Dictionary mapping slot keys to course codes
+        """
+        routine = {}
+        for slot_idx, course_idx in enumerate(genome):
+            # -1 means no course
+            if 0 <= course_idx < self.num_courses:
+                routine[self.slot_key(slot_idx)] = self.course_codes[course_idx]
+        return routine
+
+    def encode(self, routine):
+        """
+        Convert a routine dictionary back into a genome.
+
+        Args:
+            routine: Dictionary mapping slot keys to course codes
+
+        Returns:
+            Numpy array with the course index of each slot (-1 for no course
+            or for a course that is not part of this problem)
+        """
+        course_indices = {code: idx for idx, code in enumerate(self.course_codes)}
+        genome = np.full(self.num_slots, -1, dtype=np.int64)
+        for slot_idx in range(self.num_slots):
+            code = routine.get(self.slot_key(slot_idx))
+            genome[slot_idx] = course_indices.get(code, -1)
+        return genome
+
+    def fingerprint(self):
+        """
+        Return a stable hash of the problem for cache keys.
+
+        Courses are sorted by code so the order of the database rows does
+        not change the fingerprint.
+        """
+        payload = json.dumps({
+            'courses': sorted(zip(self.course_codes, self.weights.tolist())),
+            'dinner_hour': self.dinner_hour,
+            'days': self.days
+        })
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def layout_fingerprint(self):
+        """
+        Return a stable hash of the problem layout, ignoring the weights.
+
+        Two problems with the same layout share their slots and courses, so a
+        routine found for one is a valid starting point for the other.
+        """
+        payload = json.dumps({
+            'courses': sorted(self.course_codes),
+            'dinner_hour': self.dinner_hour,
+            'days': self.days
+        })
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RoutineProblem is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("RoutineProblem is immutable")
+
+    def __reduce__(self):
+        return (self.__class__, (self.course_codes, self.weights.tolist(), self.dinner_hour, self.days))
+
+    def __repr__(self):
+        return f"RoutineProblem(courses={len(self.course_codes)}, slots={self.num_slots}, dinner_hour={self.dinner_hour})"
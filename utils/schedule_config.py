@@ -0,0 +1,114 @@
+from datetime import datetime
+from types import MappingProxyType
+
+from utils.routine_grid import RoutineGrid
+
+# Class time slots as (start, end) pairs
+DEFAULT_TIME_SLOTS = (
+    ("08:00", "09:30"),
+    ("09:30", "11:00"),
+    ("11:00", "12:30"),
+    ("12:30", "14:00"),
+    ("14:00", "15:30"),
+    ("15:30", "17:00")
+)
+
+# Days of the week classes are held on
+DEFAULT_DAYS = ("Saturday", "Sunday", "Monday", "Tuesday", "Wednesday", "Thursday")
+
+# Routine theme colors
+THEMES = {
+    "blue": {
+        "name": "Blue Theme",
+        "primary": "#0d6efd",
+        "secondary": "#cfe2ff",
+        "text": "#0a58ca",
+        "header": "#0a58ca",
+        "header_text": "#ffffff"
+    },
+    "green": {
+        "name": "Green Theme",
+        "primary": "#198754",
+        "secondary": "#d1e7dd",
+        "text": "#0f5132",
+        "header": "#0f5132",
+        "header_text": "#ffffff"
+    },
+    "purple": {
+        "name": "Purple Theme",
+        "primary": "#6f42c1",
+        "secondary": "#e2d9f3",
+        "text": "#5a23c8",
+        "header": "#5a23c8",
+        "header_text": "#ffffff"
+    }
+}
+
+
+class ScheduleConfig:
+    """
+    Read-only registry of the time slots, days and themes used by every
+    routine page, form and PDF.
+
+    The registry is built once at startup. Time slots are indexed by ID
+    (the routine grid indexes them by start and end time), and each slot
+    carries its parsed ``start_time`` and ``end_time``, so routes never
+    scan the slot list or call strptime.
+    Institutions can define their own slot grid and days with the
+    SCHEDULE_TIME_SLOTS and SCHEDULE_DAYS settings.
+    """
+
+    def __init__(self, app=None):
+        self._load(DEFAULT_TIME_SLOTS, DEFAULT_DAYS)
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Load the time slots and days from the app configuration."""
+        time_slots = app.config.setdefault('SCHEDULE_TIME_SLOTS', None) or DEFAULT_TIME_SLOTS
+        days = app.config.setdefault('SCHEDULE_DAYS', None) or DEFAULT_DAYS
+        self._load(time_slots, days)
+        app.extensions['schedule_config'] = self
+
+    def _load(self, time_slots, days):
+        """
+        Build the registry.
+
+        Args:
+            time_slots: Sequence of (start, end) pairs or 'HH:MM-HH:MM' strings
+            days: Sequence of day names, in display order
+
+        Raises:
+            ValueError: If a slot time is not in HH:MM format or a slot ends before it starts
+        """
+        slots = []
+        for slot_id, slot in enumerate(time_slots, start=1):
+            start, end = slot.split('-') if isinstance(slot, str) else slot
+            start, end = start.strip(), end.strip()
+            start_time = datetime.strptime(start, '%H:%M').time()
+            end_time = datetime.strptime(end, '%H:%M').time()
+            if end_time <= start_time:
+                raise ValueError(f"Time slot {start} - {end} must end after it starts")
+
+            slots.append(MappingProxyType({
+                'id': slot_id,
+                'label': f"{start} - {end}",
+                'start': start,
+                'end': end,
+                'start_time': start_time,
+                'end_time': end_time
+            }))
+
+        self.time_slots = tuple(slots)
+        self.days = tuple(day.strip() for day in days)
+        self.themes = MappingProxyType({name: MappingProxyType(theme) for name, theme in THEMES.items()})
+
+        self._slots_by_id = {str(slot['id']): slot for slot in self.time_slots}
+
+        # Class routine grid for this slot layout
+        self.routine_grid = RoutineGrid(self.days, self.time_slots)
+
+    def slot(self, slot_id):
+        """Return the time slot with the given ID (int or form string), or None."""
+        return self._slots_by_id.get(str(slot_id))
@@ -0,0 +1,281 @@
+import os
+import re
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from flask import session
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from flask_login import user_loaded_from_cookie, user_logged_in, user_logged_out
+from werkzeug.datastructures import CallbackDict
+
+# Session IDs are random URL-safe tokens; anything else in the cookie is ignored
+_SID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session whose data lives in a server-side store; the cookie only holds its ID."""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.stale_sid = None
+
+    def regenerate(self):
+        """
+        Move the session data to a new random ID.
+
+        Called when the user logs in or out so an ID planted in the browser
+        before login can not be used to ride on the authenticated session.
+        The old ID is dropped from the store when the session is saved.
+        """
+        if not self.new and self.stale_sid is None:
+            self.stale_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.modified = True
+
+
+class FileSystemSessionStore:
+    """One file per session in a directory; the file's mtime marks the last save."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, sid):
+        return os.path.join(self.directory, sid)
+
+    def load(self, sid, ttl):
+        path = self._path(sid)
+        try:
+            if time.time() - os.path.getmtime(path) > ttl:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def save(self, sid, data, ttl):
+        # Write to a temporary file first so readers never see a partial session
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(sid))
+
+    def delete(self, sid):
+        try:
+            os.remove(self._path(sid))
+        except OSError:
+            pass
+
+    def cleanup(self, ttl):
+        """Remove the session files not saved within the TTL."""
+        cutoff = time.time() - ttl
+        removed = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+class SQLiteSessionStore:
+    """Sessions in a single SQLite table, shared by the worker processes of one node."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS sessions '
+                         '(sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def load(self, sid, ttl):
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT data FROM sessions WHERE sid = ? AND expires_at > ?',
+                               (sid, time.time())).fetchone()
+        return row[0] if row else None
+
+    def save(self, sid, data, ttl):
+        with closing(self._connect()) as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)',
+                         (sid, data, time.time() + ttl))
+
+    def delete(self, sid):
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def cleanup(self, ttl):
+        """Remove the expired sessions."""
+        with closing(self._connect()) as conn, conn:
+            return conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (time.time(),)).rowcount
+
+
+class RedisSessionStore:
+    """Sessions in Redis for multi-node deployments; Redis expires them itself."""
+
+    def __init__(self, url, prefix='session:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def load(self, sid, ttl):
+        data = self.client.get(self.prefix + sid)
+        return data.decode('utf-8') if data is not None else None
+
+    def save(self, sid, data, ttl):
+        self.client.setex(self.prefix + sid, int(ttl), data)
+
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+
+    def cleanup(self, ttl):
+        return 0
+
+
+class ServerSessionInterface(SessionInterface):
+    """
+    Flask session interface keeping the session data in a server-side store.
+
+    The cookie only carries an opaque random session ID, so requests no
+    longer send, sign and verify the whole session. Sessions expire after
+    the app's PERMANENT_SESSION_LIFETIME; stores without native expiry are
+    swept at most once per cleanup interval.
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store, cleanup_interval=600):
+        self.store = store
+        self.cleanup_interval = cleanup_interval
+        self._last_cleanup = 0.0
+        self._cleanup_lock = threading.Lock()
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and _SID_PATTERN.match(sid):
+            data = self.store.load(sid, self._ttl(app))
+            if data is not None:
+                try:
+                    return ServerSideSession(self.serializer.loads(data), sid=sid)
+                except ValueError:
+                    pass
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        cookie_name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        # Forget the ID the session had before it was regenerated
+        if session.stale_sid is not None:
+            self.store.delete(session.stale_sid)
+
+        # Drop emptied sessions from the store and the browser
+        if not session:
+            if session.modified and not (session.new and session.stale_sid is None):
+                self.store.delete(session.sid)
+                response.delete_cookie(cookie_name, domain=domain, path=path)
+            return
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not (session.modified or self.should_set_cookie(app, session)):
+            return
+
+        ttl = self._ttl(app)
+        self.store.save(session.sid, self.serializer.dumps(dict(session)), ttl)
+        response.set_cookie(
+            cookie_name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+        self._maybe_cleanup(ttl)
+
+    def _ttl(self, app):
+        return app.permanent_session_lifetime.total_seconds()
+
+    def _maybe_cleanup(self, ttl):
+        """Garbage-collect expired sessions once per cleanup interval."""
+        now = time.time()
+        if now - self._last_cleanup < self.cleanup_interval:
+            return
+        if not self._cleanup_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_cleanup = now
+            self.store.cleanup(ttl)
+        except Exception as e:
+            print(f"Error cleaning up sessions: {str(e)}")
+        finally:
+            self._cleanup_lock.release()
+
+
+class ServerSession:
+    """
+    Installs the server-side session interface from the app configuration.
+
+    SESSION_BACKEND selects the store: 'filesystem' (default) or 'sqlite' for
+    a single node, 'redis' for several nodes, or 'cookie' to keep Flask's
+    signed cookie sessions. Server-side sessions get a new ID whenever a
+    user logs in (also from a remember cookie) or out.
+    """
+
+    def __init__(self, app=None):
+        self.interface = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.setdefault('SESSION_BACKEND', 'filesystem')
+        app.config.setdefault('SESSION_FILE_DIR', os.path.join(app.instance_path, 'sessions'))
+        app.config.setdefault('SESSION_SQLITE_PATH', os.path.join(app.instance_path, 'sessions.db'))
+        app.config.setdefault('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+        app.config.setdefault('SESSION_CLEANUP_INTERVAL', 600)
+        app.extensions['server_session'] = self
+
+        if backend == 'cookie':
+            return
+        if backend == 'filesystem':
+            store = FileSystemSessionStore(app.config['SESSION_FILE_DIR'])
+        elif backend == 'sqlite':
+            store = SQLiteSessionStore(app.config['SESSION_SQLITE_PATH'])
+        elif backend == 'redis':
+            store = RedisSessionStore(app.config['SESSION_REDIS_URL'])
+        else:
+            raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+
+        self.interface = ServerSessionInterface(store, app.config['SESSION_CLEANUP_INTERVAL'])
+        app.session_interface = self.interface
+        user_logged_in.connect(_regenerate_session, app)
+        user_loaded_from_cookie.connect(_regenerate_session, app)
+        user_logged_out.connect(_regenerate_session, app)
+
+
+def _regenerate_session(sender, **extra):
+    """Give the session a new ID on login and logout."""
+    if isinstance(session._get_current_object(), ServerSideSession):
+        session.regenerate()